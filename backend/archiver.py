@@ -0,0 +1,80 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from models import MessageStatus
+from metrics import ARCHIVED
+from message_cache import message_cache
+from search_index import search_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ContactArchiver:
+    """Moves old replied messages out of the contacts collection in the background
+
+    Listings and their indexes only ever need recent or unanswered mail, so
+    keeping `contacts` small keeps them in the database's cache. Messages move
+    in batches with a pause between them, so a large backlog is worked off
+    without competing with request traffic.
+    """
+
+    def __init__(self):
+        self.archive_after = timedelta(days=180)
+        self.interval = 3600.0
+        self.batch_size = 500
+        self.batch_delay = 1.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def archive(self, db) -> int:
+        """Archive every eligible message, one batch at a time, returning how many moved"""
+        cutoff = datetime.utcnow() - self.archive_after
+        archived = 0
+        while True:
+            message_ids = await db.archive_contact_messages(MessageStatus.REPLIED.value, cutoff, self.batch_size)
+            for message_id in message_ids:
+                # Archived messages no longer take status updates, so drop any cached copy
+                message_cache.invalidate(message_id)
+            # Like listings, search covers live messages only
+            search_index.remove(message_ids)
+            archived += len(message_ids)
+            ARCHIVED.inc(amount=len(message_ids))
+            if len(message_ids) < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_delay)
+        if archived:
+            logger.info(f"Archived {archived} replied contact messages created before {cutoff:%Y-%m-%d}")
+        return archived
+
+    async def _run(self, db):
+        while True:
+            try:
+                await self.archive(db)
+            except Exception as e:
+                logger.error(f"Error archiving contact messages: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, db):
+        """Archive replied messages older than CONTACT_ARCHIVE_AFTER_DAYS (0 disables)"""
+        days = float(os.environ.get("CONTACT_ARCHIVE_AFTER_DAYS", "180"))
+        if days <= 0:
+            return
+        self.archive_after = timedelta(days=days)
+        self.interval = float(os.environ.get("CONTACT_ARCHIVE_INTERVAL", "3600"))
+        self.batch_size = int(os.environ.get("CONTACT_ARCHIVE_BATCH_SIZE", "500"))
+        self.batch_delay = float(os.environ.get("CONTACT_ARCHIVE_BATCH_DELAY", "1"))
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global archiver for old replied messages
+contact_archiver = ContactArchiver()
@@ -0,0 +1,150 @@
+import gzip
+import os
+from typing import Dict, List, Optional, Tuple
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip alone still covers every client
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Smallest body worth compressing; below this the headers and CPU cost outweigh the savings
+MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+# Per-request levels favour latency: most of the ratio for a fraction of the CPU time
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Server preference when the client weights several encodings equally
+ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """Compress `body`; `best` trades CPU for ratio, for payloads compressed once and reused"""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the encoding to use for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in ENCODINGS:
+        quality = weights.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Return raw ASGI headers with Accept-Encoding merged into Vary"""
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" in value.lower() or value.strip() == b"*":
+                return headers
+            headers = list(headers)
+            headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete JSON and text responses
+
+    Only responses sent as a single body message are compressed. Streamed
+    responses (exports, event streams) pass through untouched so that their
+    chunks reach the client as they are produced. Responses that already carry
+    a Content-Encoding, such as the pre-compressed portfolio payloads, are left
+    as they are.
+    """
+
+    def __init__(self, app, minimum_size: int = MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            headers = start.get("headers", [])
+            content_type = b""
+            eligible = True
+            for name, value in headers:
+                name = name.lower()
+                if name == b"content-type":
+                    content_type = value.decode("latin-1").lower()
+                elif name == b"content-encoding":
+                    eligible = False
+            body = message.get("body", b"")
+            if (
+                not eligible
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [
+                # The encoded bytes differ from the identity ETag's, so it can only be a weak validator
+                (name, value if name.lower() != b"etag" or value.startswith(b"W/") else b"W/" + value)
+                for name, value in headers
+                if name.lower() != b"content-length"
+            ]
+            headers = add_vary(headers) + [
+                (b"content-encoding", encoding.encode("ascii")),
+                (b"content-length", str(len(compressed)).encode("ascii")),
+            ]
+            passthrough = True
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,153 @@
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from models import ContactImportError, ContactImportResponse, ContactMessage, ContactMessageImport
+from serialization import loads
+from search_index import search_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Validates a whole chunk of records in one call instead of one model per line
+IMPORT_RECORDS = TypeAdapter(List[ContactMessageImport])
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """(1-based line number, line) pairs from a streamed body, skipping blank lines"""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if len(line) > max_line_bytes:
+                raise HTTPException(status_code=413, detail=f"Line {number} is longer than {max_line_bytes} bytes")
+            if line.strip():
+                yield number, line
+        if len(buffer) > max_line_bytes:
+            raise HTTPException(status_code=413, detail=f"Line {number + 1} is longer than {max_line_bytes} bytes")
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+class ContactImporter:
+    """Loads NDJSON contact records with chunked validation and batched inserts
+
+    Each chunk of lines is validated in one pydantic call and written with one
+    unordered batch insert, which runs while the next chunk is read and
+    validated. Lines that fail are reported by number; the rest still load.
+    """
+
+    def __init__(self, chunk_size: int = 1000, max_errors: int = 1000, max_line_bytes: int = 65536):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.max_line_bytes = max_line_bytes
+
+    @staticmethod
+    def _validate(lines: List[Tuple[int, bytes]], errors: List[Tuple[int, str]]) -> List[Tuple[int, ContactMessage]]:
+        numbers, records = [], []
+        for number, line in lines:
+            try:
+                records.append(loads(line))
+                numbers.append(number)
+            except ValueError as e:
+                errors.append((number, f"Invalid JSON: {e}"))
+
+        try:
+            validated = IMPORT_RECORDS.validate_python(records)
+        except ValidationError as e:
+            failed = {}
+            for error in e.errors():
+                index, field = error["loc"][0], ".".join(str(part) for part in error["loc"][1:])
+                failed.setdefault(index, f"{field}: {error['msg']}" if field else error["msg"])
+            errors.extend((numbers[index], message) for index, message in failed.items())
+            # Everything left is known to be valid, so the second pass cannot fail
+            kept = [index for index in range(len(records)) if index not in failed]
+            numbers = [numbers[index] for index in kept]
+            validated = IMPORT_RECORDS.validate_python([records[index] for index in kept])
+
+        return [
+            (number, ContactMessage(**record.model_dump(exclude_none=True)))
+            for number, record in zip(numbers, validated)
+        ]
+
+    @staticmethod
+    async def _insert(db, batch: List[Tuple[int, ContactMessage]]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Write one validated batch, returning (messages stored, per-line errors)"""
+        messages = [message for _, message in batch]
+        try:
+            await db.create_contact_messages(messages)
+            stored = messages
+        except Exception as e:
+            # The insert is unordered, so part of the batch may have been written
+            logger.error(f"Error importing batch of {len(messages)} contact messages: {e}")
+            stored_ids = {message.id for message in await db.get_contact_messages_by_ids([m.id for m in messages])}
+            stored = [message for message in messages if message.id in stored_ids]
+        for message in stored:
+            search_index.add(message)
+
+        stored_ids = {message.id for message in stored}
+        return len(stored), [(number, "Failed to store message") for number, message in batch if message.id not in stored_ids]
+
+    def _trim(self, errors: List[Tuple[int, str]]):
+        # Only the first max_errors are reported, so a file of bad lines cannot grow the list without bound
+        if len(errors) > 2 * self.max_errors:
+            errors.sort()
+            del errors[self.max_errors:]
+
+    async def run(self, db, chunks: AsyncIterator[bytes]) -> ContactImportResponse:
+        """Import every record in a streamed NDJSON body"""
+        received = imported = 0
+        errors: List[Tuple[int, str]] = []
+        lines: List[Tuple[int, bytes]] = []
+        pending: Optional[asyncio.Task] = None
+
+        try:
+            async for number, line in ndjson_lines(chunks, self.max_line_bytes):
+                received += 1
+                lines.append((number, line))
+                if len(lines) < self.chunk_size:
+                    continue
+                batch = self._validate(lines, errors)
+                lines = []
+                if pending is not None:
+                    stored, insert_errors = await pending
+                    imported += stored
+                    errors.extend(insert_errors)
+                self._trim(errors)
+                pending = asyncio.create_task(self._insert(db, batch))
+
+            batch = self._validate(lines, errors)
+            if pending is not None:
+                stored, insert_errors = await pending
+                imported += stored
+                errors.extend(insert_errors)
+            pending = None
+            stored, insert_errors = await self._insert(db, batch)
+            imported += stored
+            errors.extend(insert_errors)
+        finally:
+            if pending is not None:
+                # The body failed mid-stream; let the batch already sent to the database finish
+                await asyncio.gather(pending, return_exceptions=True)
+
+        errors.sort()
+        logger.info(f"Imported {imported} of {received} contact messages")
+        return ContactImportResponse(
+            success=imported == received,
+            received=received,
+            imported=imported,
+            failed=received - imported,
+            errors=[ContactImportError(line=number, error=message) for number, message in errors[:self.max_errors]]
+        )
+
+
+# Global importer for bulk contact uploads
+contact_importer = ContactImporter(
+    chunk_size=int(os.environ.get("CONTACT_IMPORT_CHUNK_SIZE", "1000")),
+    max_errors=int(os.environ.get("CONTACT_IMPORT_MAX_ERRORS", "1000")),
+    max_line_bytes=int(os.environ.get("CONTACT_IMPORT_MAX_LINE_BYTES", "65536"))
+)
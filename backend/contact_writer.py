@@ -0,0 +1,126 @@
+import asyncio
+import os
+from typing import List, Optional, Tuple
+from models import ContactMessage
+from database import database
+from spool import contact_spool
+import logging
+
+logger = logging.getLogger(__name__)
+
+WRITE_MODES = ("direct", "write_behind", "write_behind_sync")
+
+
+class ContactWriteBehind:
+    """Buffers contact messages in a bounded queue and flushes them with insert_many
+
+    The flusher writes a batch as soon as `batch_size` messages are queued, or
+    `flush_interval` seconds after the first message of a batch arrived.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.mode = "direct"
+        self.batch_size = 100
+        self.flush_interval = 0.05
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None and not self._closing
+
+    async def start(self):
+        """Read the write mode from the environment and start the flusher if enabled"""
+        self.mode = os.environ.get("CONTACT_WRITE_MODE", "direct")
+        if self.mode not in WRITE_MODES:
+            raise ValueError(f"Invalid CONTACT_WRITE_MODE '{self.mode}'. Must be one of: {list(WRITE_MODES)}")
+        if self.mode == "direct":
+            return
+
+        self.batch_size = int(os.environ.get("CONTACT_WRITE_BATCH_SIZE", "100"))
+        self.flush_interval = float(os.environ.get("CONTACT_WRITE_FLUSH_INTERVAL", "0.05"))
+        self.queue = asyncio.Queue(maxsize=int(os.environ.get("CONTACT_WRITE_QUEUE_SIZE", "10000")))
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Contact write-behind enabled (mode={self.mode}, batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval}s)"
+        )
+
+    async def stop(self):
+        """Stop accepting messages and wait until everything queued has been flushed"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._has_items.set()
+        self._batch_full.set()
+        await self._task
+        self._task = None
+        logger.info("Contact write-behind queue drained")
+
+    async def submit(self, message: ContactMessage, wait: bool = False) -> ContactMessage:
+        """Queue a message for writing; with `wait` (or in sync mode) return only once it is flushed"""
+        future = None
+        if wait or self.mode == "write_behind_sync":
+            future = asyncio.get_running_loop().create_future()
+
+        # Blocks while the queue is full, pushing back on callers instead of growing unbounded
+        await self.queue.put((message, future))
+        self._has_items.set()
+        if self.queue.qsize() >= self.batch_size:
+            self._batch_full.set()
+
+        if future is not None:
+            await future
+        return message
+
+    async def _run(self):
+        while True:
+            if self.queue.empty():
+                if self._closing:
+                    return
+                self._has_items.clear()
+                await self._has_items.wait()
+                continue
+
+            if self.queue.qsize() < self.batch_size and not self._closing:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = []
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[ContactMessage, Optional[asyncio.Future]]]):
+        messages = [message for message, _ in batch]
+        try:
+            if contact_spool.enabled:
+                # Journaled when the database is failing, which is as durable as a successful write
+                await contact_spool.store(messages)
+            else:
+                await self.db.create_contact_messages(messages)
+        except Exception as e:
+            logger.error(
+                f"Error flushing {len(batch)} queued contact messages: {e} "
+                f"(ids: {[message.id for message, _ in batch]})"
+            )
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+
+# Global write-behind pipeline for contact submissions
+contact_writer = ContactWriteBehind(database)
@@ -1,15 +1,51 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from datetime import datetime, timedelta
+import asyncio
 import os
-from models import ContactMessage, ContactMessageCreate, PortfolioConfig
+from models import ContactMessage, ContactMessageCreate, ContactStats, PortfolioConfig, CONTACT_SUMMARY_FIELDS
+from metrics import timed, DB_LATENCY
+from storage import BaseDatabase, STATS_DAY_FORMAT, portfolio_configs, stats_from_counters, stats_increments, status_change_increments
 import logging
 
 logger = logging.getLogger(__name__)
 
-class Database:
+DATABASE_BACKENDS = ("mongo", "memory", "sqlite")
+
+# _id of the one document in contact_stats
+STATS_DOCUMENT_ID = "inbox"
+
+
+class MongoDatabase(BaseDatabase):
+    # Indexes the queries below rely on, created or verified on connect
+    INDEXES: Dict[str, List[IndexModel]] = {
+        "contacts": [
+            # get_contact_message_by_id / update_message_status
+            IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+            # get_contact_messages: newest-first listing and keyset pagination
+            IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+            # Listings filtered by status, and the archiver's scan for old replied messages
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+        ],
+        "contacts_archive": [
+            # get_contact_message_by_id falling back to the archive
+            IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        ],
+        "portfolio_config": [
+            IndexModel([("section", ASCENDING)], name="section_unique", unique=True),
+        ],
+    }
+
+    # An index with no recorded use for this long is reported as unused
+    UNUSED_INDEX_AFTER = timedelta(days=7)
+
     def __init__(self):
         self.client = None
         self.db = None
+        self.index_report: Optional[dict] = None
+        self._index_task: Optional[asyncio.Task] = None
 
     async def connect(self):
         """Initialize database connection"""
@@ -18,34 +54,109 @@ class Database:
             if not mongo_url:
                 raise ValueError("MONGO_URL environment variable not set")
             
-            self.client = AsyncIOMotorClient(mongo_url)
+            # Keep a few connections open so the first requests after startup skip the handshake
+            self.client = AsyncIOMotorClient(
+                mongo_url,
+                minPoolSize=int(os.environ.get("MONGO_MIN_POOL_SIZE", "5"))
+            )
             self.db = self.client[os.environ.get('DB_NAME', 'portfolio_db')]
             
             # Test connection
-            await self.client.admin.command('ping')
+            with DB_LATENCY.time(("connect", "ping")):
+                await self.client.admin.command('ping')
             logger.info("Successfully connected to MongoDB")
             
+            # Build indexes in the background so serving is not held up by them
+            self._index_task = asyncio.create_task(self.ensure_indexes())
+            
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
+            if self.client:
+                self.client.close()
+                self.client = None
             raise
 
+    async def ensure_indexes(self) -> dict:
+        """Create any missing declared indexes, then verify and report on them"""
+        for collection, indexes in self.INDEXES.items():
+            try:
+                await self.db[collection].create_indexes(indexes)
+            except OperationFailure as e:
+                # e.g. an equivalent index under another name, or duplicate ids blocking a unique index
+                logger.error(f"Could not create indexes on {collection}: {e}")
+        
+        try:
+            self.index_report = await self.verify_indexes()
+        except Exception as e:
+            logger.error(f"Error verifying indexes: {e}")
+        return self.index_report
+
+    async def verify_indexes(self) -> dict:
+        """Report declared indexes that are missing and existing indexes that go unused"""
+        report = {}
+        now = datetime.utcnow()
+        for collection, indexes in self.INDEXES.items():
+            existing = await self.db[collection].index_information()
+            existing_keys = {tuple(info["key"]): name for name, info in existing.items()}
+            declared_keys = {tuple(index.document["key"].items()) for index in indexes}
+            
+            missing = [
+                index.document["name"] for index in indexes
+                if tuple(index.document["key"].items()) not in existing_keys
+            ]
+            undeclared = [
+                name for key, name in existing_keys.items()
+                if key not in declared_keys and name != "_id_"
+            ]
+            
+            unused = []
+            async for stats in self.db[collection].aggregate([{"$indexStats": {}}]):
+                accesses = stats.get("accesses", {})
+                since = accesses.get("since")
+                if (
+                    stats["name"] != "_id_"
+                    and accesses.get("ops", 0) == 0
+                    and since is not None
+                    and now - since.replace(tzinfo=None) >= self.UNUSED_INDEX_AFTER
+                ):
+                    unused.append(stats["name"])
+            
+            report[collection] = {"missing": missing, "undeclared": undeclared, "unused": unused}
+            if missing:
+                logger.warning(f"Missing indexes on {collection}: {missing}")
+            if undeclared:
+                logger.warning(f"Undeclared indexes on {collection}: {undeclared}")
+            if unused:
+                logger.warning(f"Unused indexes on {collection} (no ops in {self.UNUSED_INDEX_AFTER.days} days): {unused}")
+        
+        logger.info(f"Index verification complete: {report}")
+        return report
+
     async def disconnect(self):
         """Close database connection"""
+        if self._index_task and not self._index_task.done():
+            self._index_task.cancel()
         if self.client:
             self.client.close()
             logger.info("Disconnected from MongoDB")
 
     # Contact Message Operations
-    async def create_contact_message(self, message_data: ContactMessageCreate) -> ContactMessage:
+    @timed("insert")
+    async def create_contact_message(
+        self,
+        message_data: ContactMessageCreate,
+        duplicate_of: Optional[str] = None
+    ) -> ContactMessage:
         """Create a new contact message"""
         try:
-            contact_message = ContactMessage(**message_data.dict())
+            contact_message = ContactMessage(**message_data.dict(), duplicate_of=duplicate_of)
             message_dict = contact_message.dict()
             
             result = await self.db.contacts.insert_one(message_dict)
             
             if result.inserted_id:
                 logger.info(f"Contact message created with ID: {contact_message.id}")
+                await self._increment_stats(stats_increments([contact_message]))
                 return contact_message
             else:
                 raise Exception("Failed to insert contact message")
@@ -54,11 +165,53 @@ class Database:
             logger.error(f"Error creating contact message: {e}")
             raise
 
-    async def get_contact_messages(self, limit: int = 50, skip: int = 0) -> List[ContactMessage]:
-        """Retrieve contact messages with pagination"""
+    @timed("insert")
+    async def create_contact_messages(self, messages: List[ContactMessage]) -> int:
+        """Insert a batch of already-built contact messages in one round-trip"""
+        try:
+            if not messages:
+                return 0
+            
+            result = await self.db.contacts.insert_many(
+                [message.dict() for message in messages],
+                ordered=False
+            )
+            
+            logger.info(f"Inserted batch of {len(result.inserted_ids)} contact messages")
+            await self._increment_stats(stats_increments(messages))
+            return len(result.inserted_ids)
+            
+        except BulkWriteError as e:
+            # Unordered, so everything except the failed documents was written
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            await self._increment_stats(stats_increments(
+                message for index, message in enumerate(messages) if index not in failed
+            ))
+            logger.error(f"Error inserting contact message batch: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error inserting contact message batch: {e}")
+            raise
+
+    @timed("find")
+    async def get_contact_messages(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[ContactMessage]:
+        """Retrieve contact messages newest first, paginated by skip/limit or by a (created_at, id) keyset"""
         try:
-            cursor = self.db.contacts.find().sort("created_at", -1).skip(skip).limit(limit)
-            messages = await cursor.to_list(length=limit)
+            query, order = self._keyset_query(before, after)
+            cursor = self.db.contacts.find(query).sort([("created_at", order), ("id", order)])
+            if skip:
+                cursor = cursor.skip(skip)
+            messages = await cursor.limit(limit).to_list(length=limit)
+            
+            if after is not None:
+                # Pages after a cursor are read oldest first, flip them back to newest first
+                messages.reverse()
             
             return [ContactMessage(**message) for message in messages]
             
@@ -66,31 +219,280 @@ class Database:
             logger.error(f"Error retrieving contact messages: {e}")
             raise
 
+    @timed("find")
+    async def get_contact_message_summaries(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[tuple]:
+        """Retrieve CONTACT_SUMMARY_FIELDS rows only, paginated like get_contact_messages"""
+        try:
+            query, order = self._keyset_query(before, after)
+            projection = {field: 1 for field in CONTACT_SUMMARY_FIELDS}
+            projection["_id"] = 0
+            cursor = self.db.contacts.find(query, projection).sort([("created_at", order), ("id", order)])
+            if skip:
+                cursor = cursor.skip(skip)
+            documents = await cursor.limit(limit).to_list(length=limit)
+            
+            if after is not None:
+                documents.reverse()
+            
+            return [tuple(document.get(field) for field in CONTACT_SUMMARY_FIELDS) for document in documents]
+            
+        except Exception as e:
+            logger.error(f"Error retrieving contact message summaries: {e}")
+            raise
+
+    @staticmethod
+    def _keyset_query(
+        before: Optional[Tuple[datetime, str]],
+        after: Optional[Tuple[datetime, str]]
+    ) -> Tuple[dict, int]:
+        """Build the range filter and sort direction for a keyset page"""
+        if before is not None:
+            created_at, message_id = before
+            return {"$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "id": {"$lt": message_id}}
+            ]}, -1
+        if after is not None:
+            created_at, message_id = after
+            return {"$or": [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "id": {"$gt": message_id}}
+            ]}, 1
+        return {}, -1
+
+    @timed("find")
     async def get_contact_message_by_id(self, message_id: str) -> Optional[ContactMessage]:
-        """Get a specific contact message by ID"""
+        """Get a specific contact message by ID, falling back to the archive"""
         try:
             message = await self.db.contacts.find_one({"id": message_id})
+            if message is None:
+                message = await self.db.contacts_archive.find_one({"id": message_id})
             return ContactMessage(**message) if message else None
             
         except Exception as e:
             logger.error(f"Error retrieving contact message {message_id}: {e}")
             raise
 
+    @timed("find")
+    async def get_contact_messages_by_ids(self, message_ids: List[str]) -> List[ContactMessage]:
+        """Get the contact messages with the given IDs, falling back to the archive"""
+        try:
+            cursor = self.db.contacts.find({"id": {"$in": message_ids}})
+            messages = await cursor.to_list(length=len(message_ids))
+            if len(messages) < len(message_ids):
+                found = {message["id"] for message in messages}
+                missing = [message_id for message_id in message_ids if message_id not in found]
+                cursor = self.db.contacts_archive.find({"id": {"$in": missing}})
+                messages += await cursor.to_list(length=len(missing))
+            return [ContactMessage(**message) for message in messages]
+            
+        except Exception as e:
+            logger.error(f"Error retrieving contact messages by ID: {e}")
+            raise
+
+    async def iter_contact_messages(
+        self,
+        batch_size: int = 500,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> AsyncIterator[ContactMessage]:
+        """Stream matching contact messages oldest first from a server-side cursor"""
+        cursor = self.db.contacts.find(self._filter_query(status, since, until), {"_id": 0})
+        cursor = cursor.sort([("created_at", 1), ("id", 1)]).batch_size(batch_size)
+        async for message in cursor:
+            yield ContactMessage(**message)
+
+    @timed("update")
     async def update_message_status(self, message_id: str, status: str) -> bool:
         """Update the status of a contact message"""
         try:
-            result = await self.db.contacts.update_one(
-                {"id": message_id},
-                {"$set": {"status": status}}
+            previous = await self.db.contacts.find_one_and_update(
+                {"id": message_id, "status": {"$ne": status}},
+                {"$set": {"status": status}},
+                projection={"_id": 0, "status": 1}
             )
+            if previous is None:
+                return False
             
-            return result.modified_count > 0
+            await self._increment_stats(status_change_increments([(previous["status"], status)]))
+            return True
             
         except Exception as e:
             logger.error(f"Error updating message status: {e}")
             raise
 
+    @timed("update")
+    async def update_message_statuses(self, updates: Dict[str, str]) -> Dict[str, str]:
+        """Apply many status changes with one unordered bulk_write"""
+        try:
+            current = {
+                document["id"]: document["status"]
+                async for document in self.db.contacts.find(
+                    {"id": {"$in": list(updates)}}, {"_id": 0, "id": 1, "status": 1}
+                )
+            }
+            
+            results = {}
+            operations = []
+            for message_id, status in updates.items():
+                if message_id not in current:
+                    results[message_id] = "not_found"
+                elif current[message_id] == status:
+                    results[message_id] = "unchanged"
+                else:
+                    results[message_id] = "updated"
+                    operations.append(UpdateOne({"id": message_id}, {"$set": {"status": status}}))
+            
+            if operations:
+                await self.db.contacts.bulk_write(operations, ordered=False)
+                await self._increment_stats(status_change_increments(
+                    (current[message_id], updates[message_id])
+                    for message_id, outcome in results.items() if outcome == "updated"
+                ))
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error bulk updating message statuses: {e}")
+            raise
+
+    @staticmethod
+    def _filter_query(
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> dict:
+        query = {}
+        if status is not None:
+            query["status"] = status
+        if since is not None or until is not None:
+            query["created_at"] = {}
+            if since is not None:
+                query["created_at"]["$gte"] = since
+            if until is not None:
+                query["created_at"]["$lt"] = until
+        return query
+
+    @timed("find")
+    async def get_contact_message_ids(
+        self,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[str]:
+        """IDs of the messages matching a status and created_at range"""
+        try:
+            cursor = self.db.contacts.find(self._filter_query(status, since, until), {"_id": 0, "id": 1})
+            return [document["id"] async for document in cursor]
+            
+        except Exception as e:
+            logger.error(f"Error retrieving contact message IDs: {e}")
+            raise
+
+    @timed("archive")
+    async def archive_contact_messages(self, status: str, created_before: datetime, limit: int) -> List[str]:
+        """Copy one batch to contacts_archive with insert_many, then remove it with delete_many
+
+        The copy comes first, so a message is never missing from both
+        collections; a batch cut short between the two steps is finished by the
+        next run.
+        """
+        try:
+            cursor = self.db.contacts.find({"status": status, "created_at": {"$lt": created_before}}, {"_id": 0})
+            documents = await cursor.sort([("created_at", 1), ("id", 1)]).limit(limit).to_list(length=limit)
+            if not documents:
+                return []
+            
+            try:
+                await self.db.contacts_archive.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                # Duplicate keys are copies left by an interrupted run; anything else is a real failure
+                if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            
+            message_ids = [document["id"] for document in documents]
+            # Only remove messages still in `status`, in case one was updated since it was read
+            result = await self.db.contacts.delete_many({"id": {"$in": message_ids}, "status": status})
+            if result.deleted_count < len(message_ids):
+                still_hot = {
+                    document["id"] async for document in
+                    self.db.contacts.find({"id": {"$in": message_ids}}, {"_id": 0, "id": 1})
+                }
+                await self.db.contacts_archive.delete_many({"id": {"$in": list(still_hot)}})
+                message_ids = [message_id for message_id in message_ids if message_id not in still_hot]
+            
+            return message_ids
+            
+        except Exception as e:
+            logger.error(f"Error archiving contact messages: {e}")
+            raise
+
+    async def _increment_stats(self, increments: Dict[str, int]):
+        """Apply counter increments to the stats document with one $inc"""
+        if not increments:
+            return
+        try:
+            await self.db.contact_stats.update_one({"_id": STATS_DOCUMENT_ID}, {"$inc": increments}, upsert=True)
+        except Exception as e:
+            # The message write already succeeded; reconciliation will repair the counters
+            logger.error(f"Error updating contact stats: {e}")
+
+    @staticmethod
+    def _document_counters(document: dict) -> Dict[str, int]:
+        """Flatten the nested stats document into dotted-key counters"""
+        counters = {"total": document.get("total", 0)}
+        for group in ("status", "days"):
+            counters.update({f"{group}.{name}": count for name, count in document.get(group, {}).items()})
+        return counters
+
+    @timed("find")
+    async def get_contact_stats(self) -> ContactStats:
+        """Inbox counters, read from the single stats document"""
+        try:
+            document = await self.db.contact_stats.find_one({"_id": STATS_DOCUMENT_ID}) or {}
+            return stats_from_counters(self._document_counters(document))
+            
+        except Exception as e:
+            logger.error(f"Error retrieving contact stats: {e}")
+            raise
+
+    @timed("find")
+    async def reconcile_contact_stats(self) -> ContactStats:
+        """Recount contacts and contacts_archive by aggregation and replace the stats document
+
+        Increments landing between the aggregation and the replace are lost;
+        the next reconciliation picks them up.
+        """
+        try:
+            pipeline = [{"$unionWith": "contacts_archive"}, {"$facet": {
+                "status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "days": [{"$group": {
+                    "_id": {"$dateToString": {"format": STATS_DAY_FORMAT, "date": "$created_at"}},
+                    "count": {"$sum": 1}
+                }}],
+            }}]
+            facets = (await self.db.contacts.aggregate(pipeline).to_list(length=1))[0]
+            document = {
+                group: {bucket["_id"]: bucket["count"] for bucket in facets[group]}
+                for group in ("status", "days")
+            }
+            document["total"] = sum(document["status"].values())
+            await self.db.contact_stats.replace_one({"_id": STATS_DOCUMENT_ID}, document, upsert=True)
+            return stats_from_counters(self._document_counters(document))
+            
+        except Exception as e:
+            logger.error(f"Error reconciling contact stats: {e}")
+            raise
+
     # Portfolio Configuration Operations (Future use)
+    @timed("find")
     async def get_portfolio_section(self, section: str) -> Optional[PortfolioConfig]:
         """Get portfolio configuration for a specific section"""
         try:
@@ -101,7 +503,8 @@ class Database:
             logger.error(f"Error retrieving portfolio section {section}: {e}")
             raise
 
-    async def update_portfolio_section(self, section: str, data: dict) -> PortfolioConfig:
+    @timed("update")
+    async def update_portfolio_section(self, section: str, data: Union[dict, list]) -> PortfolioConfig:
         """Update or create portfolio configuration for a section"""
         try:
             config = PortfolioConfig(section=section, data=data)
@@ -120,5 +523,43 @@ class Database:
             logger.error(f"Error updating portfolio section {section}: {e}")
             raise
 
+    @timed("find")
+    async def get_portfolio_sections(self) -> List[PortfolioConfig]:
+        """Get every stored portfolio section"""
+        try:
+            configs = await self.db.portfolio_config.find({}, {"_id": 0}).to_list(length=None)
+            return portfolio_configs(configs)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving portfolio sections: {e}")
+            raise
+
+    @timed("find")
+    async def get_portfolio_revision(self) -> Tuple[int, Optional[datetime]]:
+        """Section count and newest last_updated, without reading section data"""
+        try:
+            count = await self.db.portfolio_config.count_documents({})
+            latest = await self.db.portfolio_config.find_one(
+                {}, {"_id": 0, "last_updated": 1}, sort=[("last_updated", DESCENDING)]
+            )
+            return count, latest["last_updated"] if latest else None
+            
+        except Exception as e:
+            logger.error(f"Error retrieving portfolio revision: {e}")
+            raise
+
+def create_database() -> BaseDatabase:
+    """Build the storage backend selected by DATABASE_BACKEND (mongo, memory or sqlite)"""
+    backend = os.environ.get("DATABASE_BACKEND", "mongo")
+    if backend == "mongo":
+        return MongoDatabase()
+    if backend == "memory":
+        from memory_database import MemoryDatabase
+        return MemoryDatabase()
+    if backend == "sqlite":
+        from sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(os.environ.get("SQLITE_PATH", "portfolio.sqlite3"))
+    raise ValueError(f"Invalid DATABASE_BACKEND '{backend}'. Must be one of: {list(DATABASE_BACKENDS)}")
+
 # Global database instance
-database = Database()
\ No newline at end of file
+database = create_database()
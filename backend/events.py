@@ -0,0 +1,106 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, List, NamedTuple, Optional, Set
+from serialization import dumps
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Event(NamedTuple):
+    id: int
+    # The complete SSE frame, encoded once and shared by every subscriber
+    frame: bytes
+
+
+def sse_frame(event_type: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\n".encode("utf-8") + b"data: " + dumps(data) + b"\n\n"
+
+
+# Tells a client it may have missed events and should refetch through the REST API
+RESET_FRAME = sse_frame("reset", {})
+HEARTBEAT_FRAME = b": heartbeat\n\n"
+
+
+class Subscription:
+    """One stream's pending events, bounded so a stalled client cannot hold memory
+
+    A subscriber that falls `limit` events behind is closed rather than
+    trimmed; the client reconnects with Last-Event-ID and resumes from the
+    hub's history without a silent gap.
+    """
+
+    __slots__ = ("events", "limit", "closed", "_wake")
+
+    def __init__(self, limit: int):
+        self.events: Deque[Event] = deque()
+        self.limit = limit
+        self.closed = False
+        self._wake = asyncio.Event()
+
+    def push(self, event: Event):
+        if len(self.events) >= self.limit:
+            self.closed = True
+        else:
+            self.events.append(event)
+        self._wake.set()
+
+    async def next_batch(self, timeout: float) -> Optional[List[Event]]:
+        """Pending events, [] after `timeout` idle seconds, or None once closed"""
+        if not self.events and not self.closed:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self.closed:
+            return None
+        batch = list(self.events)
+        self.events.clear()
+        return batch
+
+
+class EventHub:
+    """In-process fan-out of contact message events to SSE subscribers
+
+    Event IDs start from the wall clock in milliseconds, so they keep growing
+    across restarts and an ID from before a restart reads as a gap.
+    """
+
+    def __init__(self, history_size: int = 1000, buffer_size: int = 256):
+        self.history: Deque[Event] = deque(maxlen=history_size)
+        self.buffer_size = buffer_size
+        self.subscribers: Set[Subscription] = set()
+        self.next_id = int(time.time() * 1000)
+
+    def publish(self, event_type: str, data: Any):
+        event = Event(self.next_id, sse_frame(event_type, data, self.next_id))
+        self.next_id += 1
+        self.history.append(event)
+        for subscription in self.subscribers:
+            subscription.push(event)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber, replaying the events after `last_event_id` from history"""
+        subscription = Subscription(self.buffer_size)
+        if last_event_id is not None:
+            oldest = self.history[0].id if self.history else self.next_id
+            if last_event_id < oldest - 1:
+                subscription.events.append(Event(last_event_id, RESET_FRAME))
+            # History is bounded on its own, so a resume may exceed the live buffer limit
+            subscription.events.extend(event for event in self.history if event.id > last_event_id)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+
+# Global event hub for contact message changes
+event_hub = EventHub(
+    history_size=int(os.environ.get("SSE_HISTORY_SIZE", "1000")),
+    buffer_size=int(os.environ.get("SSE_SUBSCRIBER_BUFFER", "256"))
+)
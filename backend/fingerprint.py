@@ -0,0 +1,155 @@
+import hashlib
+import os
+import re
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Optional, Tuple
+from models import ContactMessage
+from metrics import DUPLICATES
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Any script, so non-Latin messages do not all fingerprint alike
+TOKEN_PATTERN = re.compile(r"\w+")
+DUPLICATE_ACTIONS = ("off", "flag", "drop")
+
+# Distinct terms a message needs before its fingerprint is compared; fewer
+# leave too few weights to set the 64 bits apart
+MIN_TERMS = 5
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over term frequencies; texts sharing most words differ in few bits"""
+    return _simhash_terms(Counter(TOKEN_PATTERN.findall(text.lower())))
+
+
+def _simhash_terms(terms: Counter) -> int:
+    # Word shingles are too brittle for messages this short: one edited word
+    # changes several shingles out of a few dozen
+    weights = [0] * 64
+    for term, count in terms.items():
+        value = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def message_fingerprint(subject: str, message: str, min_terms: int = MIN_TERMS) -> Optional[int]:
+    """SimHash of a message, or None when it has fewer than `min_terms` distinct terms"""
+    terms = Counter(TOKEN_PATTERN.findall(f"{subject} {message}".lower()))
+    if len(terms) < min_terms:
+        return None
+    return _simhash_terms(terms)
+
+
+class RecentFingerprints:
+    """Fingerprints seen within a time window, indexed for near-duplicate lookup
+
+    The 64 bits are split into max_distance + 1 bands. Two fingerprints within
+    max_distance bits of each other must agree exactly on at least one band,
+    so a lookup only compares against the few entries sharing a band value.
+    """
+
+    def __init__(self, max_distance: int = 6, window_seconds: float = 86400, max_entries: int = 100000):
+        self.max_distance = max_distance
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        band_count = max_distance + 1
+        self.bands = [(64 * i // band_count, 64 * (i + 1) // band_count) for i in range(band_count)]
+        self.buckets: Dict[Tuple[int, int], Dict[str, int]] = {}
+        self.entries: Deque[Tuple[float, str, int]] = deque()
+
+    def _band_keys(self, fingerprint: int):
+        for index, (start, end) in enumerate(self.bands):
+            yield index, fingerprint >> start & ((1 << (end - start)) - 1)
+
+    def _expire(self, now: float):
+        while self.entries and (
+            len(self.entries) > self.max_entries or now - self.entries[0][0] > self.window_seconds
+        ):
+            _, message_id, fingerprint = self.entries.popleft()
+            for key in self._band_keys(fingerprint):
+                bucket = self.buckets.get(key)
+                if bucket is not None:
+                    bucket.pop(message_id, None)
+                    if not bucket:
+                        del self.buckets[key]
+
+    def find(self, fingerprint: int, now: Optional[float] = None) -> Optional[Tuple[str, int]]:
+        """Closest remembered (message ID, distance) within max_distance bits, if any"""
+        self._expire(time.time() if now is None else now)
+        best = None
+        for key in self._band_keys(fingerprint):
+            for message_id, other in self.buckets.get(key, {}).items():
+                distance = (fingerprint ^ other).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (message_id, distance)
+        return best
+
+    def add(self, fingerprint: int, message_id: str, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self.entries.append((now, message_id, fingerprint))
+        for key in self._band_keys(fingerprint):
+            self.buckets.setdefault(key, {})[message_id] = fingerprint
+        self._expire(now)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class DuplicateDetector:
+    """Flags or drops contact submissions that nearly repeat a recent one
+
+    DUPLICATE_ACTION is "flag" (store with duplicate_of set, the default),
+    "drop" (do not store, answer as if stored) or "off".
+    """
+
+    def __init__(self):
+        self.action = os.environ.get("DUPLICATE_ACTION", "flag")
+        if self.action not in DUPLICATE_ACTIONS:
+            raise ValueError(f"Invalid DUPLICATE_ACTION '{self.action}'. Must be one of: {list(DUPLICATE_ACTIONS)}")
+        self.recent = RecentFingerprints(
+            max_distance=int(os.environ.get("DUPLICATE_MAX_DISTANCE", "6")),
+            window_seconds=float(os.environ.get("DUPLICATE_WINDOW_SECONDS", "86400")),
+            max_entries=int(os.environ.get("DUPLICATE_MAX_ENTRIES", "100000"))
+        )
+        self.min_terms = int(os.environ.get("DUPLICATE_MIN_TERMS", str(MIN_TERMS)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.action != "off"
+
+    def check(self, subject: str, message: str) -> Tuple[Optional[int], Optional[str]]:
+        """Return (fingerprint, ID of the recent message it nearly duplicates or None)
+
+        Messages with too few terms to fingerprint reliably are never checked or remembered.
+        """
+        fingerprint = message_fingerprint(subject, message, self.min_terms)
+        if fingerprint is None:
+            return None, None
+        match = self.recent.find(fingerprint)
+        if match is None:
+            return fingerprint, None
+        DUPLICATES.inc((self.action,))
+        logger.info(f"Near-duplicate of {match[0]} ({match[1]} bits apart), action={self.action}")
+        return fingerprint, match[0]
+
+    def remember(self, fingerprint: int, message: ContactMessage, created: Optional[float] = None):
+        """Index a stored message's fingerprint; `created` defaults to now"""
+        self.recent.add(fingerprint, message.id, now=created)
+
+    async def warm(self, db):
+        """Load fingerprints of messages created within the window"""
+        since = datetime.utcnow() - timedelta(seconds=self.recent.window_seconds)
+        async for message in db.iter_contact_messages(since=since):
+            fingerprint = message_fingerprint(message.subject, message.message, self.min_terms)
+            if fingerprint is not None:
+                created = message.created_at.replace(tzinfo=timezone.utc).timestamp()
+                self.remember(fingerprint, message, created)
+        logger.info(f"Duplicate detector warmed with {len(self.recent)} recent fingerprints")
+
+
+# Global near-duplicate detector for contact submissions
+duplicate_detector = DuplicateDetector()
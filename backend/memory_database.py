@@ -0,0 +1,244 @@
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from copy import deepcopy
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from datetime import datetime
+from collections import Counter
+from models import ContactMessage, ContactMessageCreate, ContactStats, PortfolioConfig, CONTACT_SUMMARY_FIELDS
+from storage import BaseDatabase, stats_from_counters, stats_increments, status_change_increments
+from metrics import timed
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MemoryDatabase(BaseDatabase):
+    """Process-local storage for tests, benchmarks and single-instance deployments
+
+    Messages are kept as plain dicts keyed by ID, plus a list of
+    (created_at, id) keys in ascending order that serves the newest-first
+    listing and keyset pagination with bisect instead of a sort.
+    """
+
+    def __init__(self):
+        self.contacts: Dict[str, dict] = {}
+        self.archive: Dict[str, dict] = {}
+        self.portfolio_config: Dict[str, dict] = {}
+        self._order: List[Tuple[datetime, str]] = []
+        # Inbox counters under the dotted keys shared with the other backends
+        self.stats: Counter = Counter()
+
+    async def connect(self):
+        """Initialize database connection"""
+        logger.info("Using in-memory storage")
+
+    async def disconnect(self):
+        """Close database connection"""
+        logger.info("Disconnected from in-memory storage")
+
+    def _insert(self, message: ContactMessage):
+        if message.id in self.contacts:
+            raise ValueError(f"Duplicate contact message ID: {message.id}")
+        self.contacts[message.id] = message.dict()
+        insort(self._order, (message.created_at, message.id))
+        self.stats.update(stats_increments([message]))
+
+    def _page(
+        self,
+        limit: int,
+        skip: int,
+        before: Optional[Tuple[datetime, str]],
+        after: Optional[Tuple[datetime, str]]
+    ) -> List[dict]:
+        """Documents for one newest-first page"""
+        if after is not None:
+            start = bisect_right(self._order, after) + skip
+            keys = self._order[start:start + limit]
+            keys.reverse()
+        else:
+            end = bisect_left(self._order, before) if before is not None else len(self._order)
+            end = max(end - skip, 0)
+            keys = self._order[max(end - limit, 0):end]
+            keys.reverse()
+        return [self.contacts[message_id] for _, message_id in keys]
+
+    # Contact Message Operations
+    @timed("insert")
+    async def create_contact_message(
+        self,
+        message_data: ContactMessageCreate,
+        duplicate_of: Optional[str] = None
+    ) -> ContactMessage:
+        """Create a new contact message"""
+        contact_message = ContactMessage(**message_data.dict(), duplicate_of=duplicate_of)
+        self._insert(contact_message)
+        logger.info(f"Contact message created with ID: {contact_message.id}")
+        return contact_message
+
+    @timed("insert")
+    async def create_contact_messages(self, messages: List[ContactMessage]) -> int:
+        """Insert a batch of already-built contact messages"""
+        # Like an unordered insert_many: write everything that fits, then report duplicates
+        duplicates = []
+        for message in messages:
+            try:
+                self._insert(message)
+            except ValueError:
+                duplicates.append(message.id)
+        if duplicates:
+            raise ValueError(f"Duplicate contact message IDs: {duplicates}")
+        return len(messages)
+
+    @timed("find")
+    async def get_contact_messages(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[ContactMessage]:
+        """Retrieve contact messages newest first, paginated by skip/limit or by a (created_at, id) keyset"""
+        return [ContactMessage(**message) for message in self._page(limit, skip, before, after)]
+
+    @timed("find")
+    async def get_contact_message_summaries(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[tuple]:
+        """Retrieve CONTACT_SUMMARY_FIELDS rows only, paginated like get_contact_messages"""
+        return [
+            tuple(message[field] for field in CONTACT_SUMMARY_FIELDS)
+            for message in self._page(limit, skip, before, after)
+        ]
+
+    @timed("find")
+    async def get_contact_message_by_id(self, message_id: str) -> Optional[ContactMessage]:
+        """Get a specific contact message by ID, falling back to the archive"""
+        message = self.contacts.get(message_id) or self.archive.get(message_id)
+        return ContactMessage(**message) if message else None
+
+    @timed("find")
+    async def get_contact_messages_by_ids(self, message_ids: List[str]) -> List[ContactMessage]:
+        """Get the contact messages with the given IDs, falling back to the archive"""
+        messages = (self.contacts.get(message_id) or self.archive.get(message_id) for message_id in message_ids)
+        return [ContactMessage(**message) for message in messages if message]
+
+    async def iter_contact_messages(
+        self,
+        batch_size: int = 500,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> AsyncIterator[ContactMessage]:
+        """Yield matching contact messages oldest first, yielding to the event loop between batches"""
+        start = bisect_left(self._order, (since,)) if since is not None else 0
+        while True:
+            keys = self._order[start:start + batch_size]
+            if not keys:
+                return
+            for created_at, message_id in keys:
+                if until is not None and created_at >= until:
+                    return
+                # Keys come from a slice taken before yielding, so a message may have been archived since
+                message = self.contacts.get(message_id)
+                if message is not None and (status is None or message["status"] == status):
+                    yield ContactMessage(**message)
+            # Resume after the last key rather than an offset, so concurrent inserts cannot shift the scan
+            start = bisect_right(self._order, keys[-1])
+            await asyncio.sleep(0)
+
+    @timed("update")
+    async def update_message_status(self, message_id: str, status: str) -> bool:
+        """Update the status of a contact message"""
+        message = self.contacts.get(message_id)
+        if message is None or message["status"] == status:
+            return False
+        self.stats.update(status_change_increments([(message["status"], status)]))
+        message["status"] = status
+        return True
+
+    @timed("update")
+    async def update_message_statuses(self, updates: Dict[str, str]) -> Dict[str, str]:
+        """Apply many status changes at once"""
+        results = {}
+        for message_id, status in updates.items():
+            message = self.contacts.get(message_id)
+            if message is None:
+                results[message_id] = "not_found"
+            elif message["status"] == status:
+                results[message_id] = "unchanged"
+            else:
+                self.stats.update(status_change_increments([(message["status"], status)]))
+                message["status"] = status
+                results[message_id] = "updated"
+        return results
+
+    @timed("find")
+    async def get_contact_message_ids(
+        self,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[str]:
+        """IDs of the messages matching a status and created_at range"""
+        start = bisect_left(self._order, (since,)) if since is not None else 0
+        end = bisect_left(self._order, (until,)) if until is not None else len(self._order)
+        return [
+            message_id for _, message_id in self._order[start:end]
+            if status is None or self.contacts[message_id]["status"] == status
+        ]
+
+    @timed("archive")
+    async def archive_contact_messages(self, status: str, created_before: datetime, limit: int) -> List[str]:
+        """Move one batch of old messages from the live index to the archive"""
+        end = bisect_left(self._order, (created_before,))
+        message_ids = [
+            message_id for _, message_id in self._order[:end]
+            if self.contacts[message_id]["status"] == status
+        ][:limit]
+        for message_id in message_ids:
+            self.archive[message_id] = self.contacts.pop(message_id)
+        if message_ids:
+            moved = set(message_ids)
+            self._order = [key for key in self._order if key[1] not in moved]
+        return message_ids
+
+    @timed("find")
+    async def get_contact_stats(self) -> ContactStats:
+        """Inbox counters"""
+        return stats_from_counters(self.stats)
+
+    @timed("find")
+    async def reconcile_contact_stats(self) -> ContactStats:
+        """Recount the inbox from the stored and archived messages"""
+        messages = list(self.contacts.values()) + list(self.archive.values())
+        self.stats = Counter(stats_increments(ContactMessage(**message) for message in messages))
+        return stats_from_counters(self.stats)
+
+    # Portfolio Configuration Operations
+    @timed("find")
+    async def get_portfolio_section(self, section: str) -> Optional[PortfolioConfig]:
+        """Get portfolio configuration for a specific section"""
+        config = self.portfolio_config.get(section)
+        return PortfolioConfig(**deepcopy(config)) if config else None
+
+    @timed("update")
+    async def update_portfolio_section(self, section: str, data: Union[dict, list]) -> PortfolioConfig:
+        """Update or create portfolio configuration for a section"""
+        config = PortfolioConfig(section=section, data=data)
+        self.portfolio_config[section] = deepcopy(config.dict())
+        logger.info(f"Portfolio section {section} updated")
+        return config
+
+    @timed("find")
+    async def get_portfolio_sections(self) -> List[PortfolioConfig]:
+        """Get every stored portfolio section"""
+        return [PortfolioConfig(**deepcopy(config)) for config in self.portfolio_config.values()]
+
+    @timed("find")
+    async def get_portfolio_revision(self) -> Tuple[int, Optional[datetime]]:
+        """Section count and newest last_updated"""
+        latest = max((config["last_updated"] for config in self.portfolio_config.values()), default=None)
+        return len(self.portfolio_config), latest
@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+from models import ContactMessage, MessageStatus
+from metrics import MESSAGE_CACHE
+
+
+def message_etag(message: ContactMessage) -> str:
+    """Strong ETag for a message; only its status changes after creation"""
+    return '"' + hashlib.sha256(f"{message.id}:{MessageStatus(message.status).value}".encode("utf-8")).hexdigest()[:32] + '"'
+
+
+class MessageCache:
+    """Read-through LRU cache of contact messages by ID, with a TTL and single-flight loads
+
+    Concurrent misses for one ID share a single database call. Writers call
+    `invalidate`; a load that was already in flight when its ID was
+    invalidated still answers its waiters but is not cached. Missing IDs are
+    not cached, since a spooled message may appear later under its ID.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, ContactMessage]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stale: Set[str] = set()
+
+    async def get(
+        self,
+        message_id: str,
+        load: Callable[[str], Awaitable[Optional[ContactMessage]]]
+    ) -> Optional[ContactMessage]:
+        if self.max_entries <= 0:
+            return await load(message_id)
+
+        entry = self.entries.get(message_id)
+        if entry is not None:
+            expires, message = entry
+            if time.monotonic() < expires:
+                self.entries.move_to_end(message_id)
+                MESSAGE_CACHE.inc(("hit",))
+                return message
+            del self.entries[message_id]
+
+        inflight = self._inflight.get(message_id)
+        if inflight is not None:
+            MESSAGE_CACHE.inc(("coalesced",))
+            # Shielded so one waiter's cancellation does not cancel the shared load
+            return await asyncio.shield(inflight)
+
+        MESSAGE_CACHE.inc(("miss",))
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[message_id] = future
+        try:
+            message = await load(message_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so asyncio does not warn when no other request was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(message)
+            if message is not None and message_id not in self._stale:
+                self.entries[message_id] = (time.monotonic() + self.ttl, message)
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return message
+        finally:
+            del self._inflight[message_id]
+            self._stale.discard(message_id)
+
+    def invalidate(self, message_id: str):
+        self.entries.pop(message_id, None)
+        if message_id in self._inflight:
+            self._stale.add(message_id)
+
+
+# Global cache of single-message lookups
+message_cache = MessageCache(
+    max_entries=int(os.environ.get("MESSAGE_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("MESSAGE_CACHE_TTL", "30"))
+)
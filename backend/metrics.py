@@ -0,0 +1,176 @@
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Upper bounds in seconds, from sub-millisecond cache hits to slow Mongo calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, rendered in Prometheus text format"""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last slot is +Inf), sum]
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    @contextmanager
+    def time(self, labels: tuple):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, time.perf_counter() - started)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ("method", "route", "status")
+)
+DB_LATENCY = Histogram(
+    "db_operation_duration_seconds",
+    "Time spent in Database methods",
+    ("method", "operation")
+)
+DB_ERRORS = Counter(
+    "db_operation_errors_total",
+    "Database method calls that raised",
+    ("method", "operation")
+)
+DUPLICATES = Counter(
+    "contact_duplicates_total",
+    "Contact submissions matching a recent message's fingerprint, by configured action",
+    ("action",)
+)
+SPOOL_EVENTS = Counter(
+    "contact_spool_messages_total",
+    "Contact messages written to the local spool journal, and replayed from it into the database",
+    ("event",)
+)
+MESSAGE_CACHE = Counter(
+    "message_cache_lookups_total",
+    "Single-message lookups by cache outcome: hit, miss, or coalesced onto an in-flight miss",
+    ("result",)
+)
+ARCHIVED = Counter(
+    "contact_messages_archived_total",
+    "Replied contact messages moved from contacts to contacts_archive"
+)
+RATE_LIMITED = Counter(
+    "contact_rate_limited_total",
+    "Contact submissions rejected with 429, by the limiter that rejected them",
+    ("key",)
+)
+
+METRICS = [REQUEST_LATENCY, DB_LATENCY, DB_ERRORS, RATE_LIMITED, DUPLICATES, SPOOL_EVENTS, MESSAGE_CACHE, ARCHIVED]
+
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed(operation: str):
+    """Record a Database coroutine method's latency under (method name, operation)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            labels = (func.__name__, operation)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                DB_ERRORS.inc(labels)
+                raise
+            finally:
+                DB_LATENCY.observe(labels, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template and status code"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in scope; label by its template, not the raw path
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe((scope["method"], template, str(status)), time.perf_counter() - started)
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
+from pydantic.networks import validate_email
+from typing import Dict, List, Optional, Union
+from functools import lru_cache
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 class MessageStatus(str, Enum):
@@ -15,6 +17,33 @@ class ContactMessageCreate(BaseModel):
     subject: str = Field(..., min_length=5, max_length=200, description="Message subject")
     message: str = Field(..., min_length=10, max_length=1000, description="Message content")
 
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored timestamps are naive UTC, like datetime.utcnow()
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@lru_cache(maxsize=65536)
+def _checked_email(value: str) -> str:
+    return validate_email(value)[1]
+
+class ContactMessageImport(ContactMessageCreate):
+    """One NDJSON record for /api/contact/import; history may keep its original timestamp and status"""
+    # EmailStr's check, memoized: it dominates validation cost and an import repeats senders
+    email: str = Field(..., description="Valid email address")
+    created_at: Optional[datetime] = None
+    status: MessageStatus = MessageStatus.UNREAD
+
+    @field_validator("email")
+    @classmethod
+    def valid_email(cls, value: str) -> str:
+        return _checked_email(value)
+
+    @field_validator("created_at")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return to_naive_utc(value)
+
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -23,15 +52,88 @@ class ContactMessage(BaseModel):
     message: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     status: MessageStatus = Field(default=MessageStatus.UNREAD)
+    # ID of the recent message this one nearly repeats, when flagged on submission
+    duplicate_of: Optional[str] = None
 
     class Config:
         use_enum_values = True
 
+class ContactStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    # Messages created per UTC day, keyed "YYYY-MM-DD", oldest first
+    by_day: Dict[str, int]
+
+# Columns returned, in order, by the summary listing (`?view=summary`)
+CONTACT_SUMMARY_FIELDS = ("id", "name", "subject", "status", "created_at")
+
+class ContactMessageSummaryPage(BaseModel):
+    """A `?view=summary` listing page: column names once, then one row of values per message"""
+    fields: List[str]
+    rows: List[List[Union[str, datetime]]]
+
 class ContactMessageResponse(BaseModel):
     success: bool
     message: str
     contact_id: Optional[str] = None
 
+class ContactMessageSearchHit(BaseModel):
+    score: float
+    message: ContactMessage
+
+class ContactMessageSearchResponse(BaseModel):
+    query: str
+    total: int
+    # False when matching stopped at the search caps and `total` is a lower bound
+    total_exact: bool = True
+    results: List[ContactMessageSearchHit]
+
+class ContactImportError(BaseModel):
+    # 1-based line number in the uploaded NDJSON
+    line: int
+    error: str
+
+class ContactImportResponse(BaseModel):
+    success: bool
+    received: int
+    imported: int
+    failed: int
+    # The first failures only, when there are very many
+    errors: List[ContactImportError]
+
+class MessageStatusUpdate(BaseModel):
+    message_id: str
+    status: MessageStatus
+
+class MessageFilter(BaseModel):
+    status: Optional[MessageStatus] = Field(None, description="Only messages currently in this status")
+    since: Optional[datetime] = Field(None, description="Only messages created at or after this time")
+    until: Optional[datetime] = Field(None, description="Only messages created before this time")
+
+    @field_validator("since", "until")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return to_naive_utc(value)
+
+class BulkStatusUpdateRequest(BaseModel):
+    updates: Optional[List[MessageStatusUpdate]] = Field(None, max_length=1000)
+    filter: Optional[MessageFilter] = None
+    status: Optional[MessageStatus] = Field(None, description="Target status for messages matching `filter`")
+
+    @model_validator(mode="after")
+    def check_mode(self):
+        if self.updates is not None and self.filter is not None:
+            raise ValueError("Provide either 'updates' or 'filter' with 'status', not both")
+        if self.updates is None and (self.filter is None or self.status is None):
+            raise ValueError("Provide 'updates', or 'filter' together with 'status'")
+        return self
+
+class BulkStatusUpdateResponse(BaseModel):
+    success: bool
+    updated: int
+    # message_id -> "updated", "unchanged" or "not_found"
+    results: Dict[str, str]
+
 class PortfolioSection(str, Enum):
     PERSONAL = "personal"
     EXPERIENCE = "experience"
@@ -43,7 +145,8 @@ class PortfolioSection(str, Enum):
 class PortfolioConfig(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     section: PortfolioSection
-    data: dict
+    # Sections such as experience and projects are lists
+    data: Union[dict, list]
     last_updated: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
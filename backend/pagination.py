@@ -0,0 +1,22 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from models import to_naive_utc
+
+
+def encode_cursor(created_at: datetime, message_id: str) -> str:
+    """Build an opaque keyset cursor from a message's (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), message_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, message_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        # Keys compare against naive UTC timestamps; a cursor carrying an offset is converted
+        return to_naive_utc(datetime.fromisoformat(created_at)), str(message_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
@@ -0,0 +1,173 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from compression import ENCODINGS, MIN_SIZE, compress
+from serialization import dumps
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def etag_matches(if_none_match: Optional[str], etags: Set[str]) -> bool:
+    """Check an If-None-Match header against the current ETags of a resource"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses the weak comparison function
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+class CachedPayload:
+    """A response body serialized once, with its strong ETag and compressed variants
+
+    Snapshot payloads (`best`) are compressed up front at the highest levels,
+    since the cost is paid once per snapshot. Others, such as `?fields=`
+    selections that any client can vary, are compressed on first request for
+    each encoding at the per-request levels.
+    """
+
+    __slots__ = ("body", "etag", "encoded")
+
+    def __init__(self, payload: dict, best: bool = True):
+        self.body = dumps(payload)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.encoded: Dict[str, bytes] = {}
+        if best:
+            for encoding in self.encodings:
+                self.encoded[encoding] = compress(self.body, encoding, best=True)
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Encodings this payload is served in besides identity"""
+        return ENCODINGS if len(self.body) >= MIN_SIZE else ()
+
+    def _variant_etag(self, encoding: str) -> str:
+        return self.etag[:-1] + "-" + encoding + '"'
+
+    def variant(self, encoding: Optional[str]) -> Tuple[bytes, str]:
+        """Body and ETag for a negotiated encoding; each encoding is its own representation"""
+        if encoding not in self.encodings:
+            return self.body, self.etag
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = compress(self.body, encoding)
+        return body, self._variant_etag(encoding)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header against this payload's ETags"""
+        etags = {self._variant_etag(encoding) for encoding in self.encodings}
+        etags.add(self.etag)
+        return etag_matches(if_none_match, etags)
+
+
+def build_path_index(data: dict) -> Dict[str, Tuple[str, ...]]:
+    """Map every selectable dotted path to its keys; items of a list share one set of paths"""
+    index: Dict[str, Tuple[str, ...]] = {}
+
+    def walk(node: Any, path: Tuple[str, ...]):
+        if isinstance(node, list):
+            for item in node:
+                walk(item, path)
+        elif isinstance(node, dict):
+            for key, value in node.items():
+                child = path + (key,)
+                index[".".join(child)] = child
+                walk(value, child)
+
+    walk(data, ())
+    return index
+
+
+def _selection_tree(paths: Iterable[Tuple[str, ...]]) -> dict:
+    """Nest key paths into {key: subtree}, where None selects the whole subtree"""
+    tree: dict = {}
+    # Shorter paths first, so a selected ancestor absorbs its descendants
+    for path in sorted(paths, key=len):
+        node = tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+            if node is None:
+                break
+        else:
+            node[path[-1]] = None
+    return tree
+
+
+def _project(node: Any, tree: Optional[dict]) -> Any:
+    if tree is None:
+        return node
+    if isinstance(node, list):
+        return [_project(item, tree) for item in node]
+    if isinstance(node, dict):
+        return {key: _project(value, tree[key]) for key, value in node.items() if key in tree}
+    return node
+
+
+class PortfolioCache:
+    """Pre-serialized portfolio payloads, rebuilt only when the source changes"""
+
+    def __init__(self, max_selections: int = 256):
+        self._source = None
+        self.version = 0
+        self.full: Optional[CachedPayload] = None
+        self.sections: Dict[str, CachedPayload] = {}
+        self.paths: Dict[str, Tuple[str, ...]] = {}
+        # Serialized `?fields=` selections of the current source, least recently used first
+        self.max_selections = max_selections
+        self._selections: "OrderedDict[Tuple[str, ...], CachedPayload]" = OrderedDict()
+
+    def refresh(self, data: dict, version: int = 0) -> bool:
+        """Rebuild the cached payloads if `data` is not the source already cached"""
+        if data is self._source:
+            return False
+
+        full = CachedPayload({"success": True, "data": data})
+        sections = {
+            section: CachedPayload({"success": True, "section": section, "data": section_data})
+            for section, section_data in data.items()
+        }
+
+        paths = build_path_index(data)
+
+        # Build everything first so a failed rebuild leaves the old payloads in place
+        self.full, self.sections, self._source, self.version = full, sections, data, version
+        self.paths, self._selections = paths, OrderedDict()
+        logger.info(f"Portfolio cache rebuilt for v{version} ({len(full.body)} bytes, {len(sections)} sections)")
+        return True
+
+    def section(self, section: str) -> Optional[CachedPayload]:
+        return self.sections.get(section)
+
+    def select(self, fields: str) -> CachedPayload:
+        """Payload holding only the comma-separated dotted paths in `fields`"""
+        requested = tuple(sorted({field.strip() for field in fields.split(",") if field.strip()}))
+        if not requested:
+            raise ValueError("No fields requested")
+
+        payload = self._selections.get(requested)
+        if payload is not None:
+            self._selections.move_to_end(requested)
+            return payload
+
+        unknown = [field for field in requested if field not in self.paths]
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}")
+        tree = _selection_tree(self.paths[field] for field in requested)
+        payload = CachedPayload({"success": True, "data": _project(self._source, tree)}, best=False)
+
+        self._selections[requested] = payload
+        if len(self._selections) > self.max_selections:
+            self._selections.popitem(last=False)
+        return payload
+
+
+# Global portfolio cache instance
+portfolio_cache = PortfolioCache(max_selections=int(os.environ.get("PORTFOLIO_FIELDS_CACHE_SIZE", "256")))
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from copy import deepcopy
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+from portfolio_cache import PortfolioCache, portfolio_cache
+from portfolio_data import PORTFOLIO_DATA
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioSnapshot(NamedTuple):
+    """One published version of the portfolio; never mutated once built"""
+    version: int
+    data: dict
+    # (section count, newest last_updated) of portfolio_config when loaded
+    revision: Tuple[int, Optional[datetime]]
+
+
+class PortfolioStore:
+    """Serves portfolio content from an in-memory snapshot of portfolio_config
+
+    Sections missing from portfolio_config come from the static PORTFOLIO_DATA.
+    A background task polls the collection's revision and, when it moves,
+    loads a new snapshot and swaps it in along with the pre-serialized cache.
+    """
+
+    def __init__(self, fallback: dict, cache: PortfolioCache):
+        self.fallback = fallback
+        self.cache = cache
+        self.snapshot = PortfolioSnapshot(version=0, data=fallback, revision=(0, None))
+        self.cache.refresh(fallback, version=0)
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self, db, revision: Tuple[int, Optional[datetime]] = None):
+        """Build a snapshot from the stored sections and publish it"""
+        if revision is None:
+            revision = await db.get_portfolio_revision()
+        configs = {config.section: config.data for config in await db.get_portfolio_sections()}
+
+        # Keep the static section order, stored sections override their static counterparts
+        data = {section: configs.pop(section, content) for section, content in self.fallback.items()}
+        data.update(configs)
+        data = deepcopy(data)
+
+        snapshot = PortfolioSnapshot(version=self.snapshot.version + 1, data=data, revision=revision)
+        self.cache.refresh(snapshot.data, version=snapshot.version)
+        self.snapshot = snapshot
+        logger.info(f"Portfolio snapshot v{snapshot.version} published (revision {revision})")
+
+    async def check(self, db) -> bool:
+        """Reload if portfolio_config changed since the current snapshot"""
+        revision = await db.get_portfolio_revision()
+        if revision == self.snapshot.revision:
+            return False
+        await self.load(db, revision)
+        return True
+
+    async def _run(self, db, interval: float):
+        while True:
+            try:
+                await self.check(db)
+            except Exception as e:
+                logger.error(f"Error refreshing portfolio snapshot: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, db):
+        """Start polling portfolio_config every PORTFOLIO_REFRESH_INTERVAL seconds (0 disables)"""
+        interval = float(os.environ.get("PORTFOLIO_REFRESH_INTERVAL", "30"))
+        if interval > 0:
+            self._task = asyncio.create_task(self._run(db, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global portfolio content store
+portfolio_store = PortfolioStore(PORTFOLIO_DATA, portfolio_cache)
@@ -0,0 +1,224 @@
+import asyncio
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shared secret that both selects requests (X-Profile) and unlocks the profiles endpoint; empty disables profiling
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+
+# Leaf frame for samples taken while the request's task was suspended rather than running
+AWAIT_FRAME = "[await]"
+
+
+def _label(code) -> str:
+    # ';' separates frames in collapsed stacks and never appears in a qualified name or file name
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _await_chain(coro) -> List[str]:
+    """Frames of a suspended coroutine chain, outermost first"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(_label(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+class Profile:
+    """Collapsed stack samples for one request"""
+
+    __slots__ = ("id", "method", "path", "route", "status", "started", "duration", "stacks", "task", "thread_id")
+
+    def __init__(self, profile_id: int, method: str, path: str, task: asyncio.Task):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started = time.time()
+        self.duration = 0.0
+        self.stacks: Counter = Counter()
+        self.task = task
+        self.thread_id = threading.get_ident()
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route or self.path}"
+
+    def sample(self, frames: Dict[int, object]):
+        """Record where the request is now: the running stack, or the await chain it is suspended in"""
+        coro = self.task.get_coro()
+        root = getattr(coro, "cr_frame", None)
+        stack = []
+        frame = frames.get(self.thread_id)
+        while frame is not None:
+            stack.append(_label(frame.f_code))
+            if frame is root:
+                # Running: keep the request's own frames, not the event loop's beneath them
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+                return
+            frame = frame.f_back
+        self.stacks[tuple(_await_chain(coro)) + (AWAIT_FRAME,)] += 1
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started": self.started,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": sum(self.stacks.values()),
+        }
+
+
+class SamplingProfiler:
+    """Samples the stacks of selected in-flight requests from a background thread
+
+    Only requests that are being profiled are looked at, and the thread sleeps
+    while there are none, so unprofiled traffic pays for one random() call.
+    Samples are wall-clock: a request waiting on the database is recorded in
+    the await chain it is suspended in, ending in an [await] frame. Work handed
+    to the thread pool is not seen, and since the sampler needs the GIL, samples
+    lean towards calls that release it (I/O, os.urandom).
+    """
+
+    def __init__(self, interval: float = 0.005, buffer_size: int = 50):
+        self.interval = interval
+        self.profiles: Deque[Profile] = deque(maxlen=buffer_size)
+        self._active: Dict[int, Profile] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ids = itertools.count(1)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            # Held while sampling, so a profile is never written to after `finish`
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                frames = sys._current_frames()
+                for profile in self._active.values():
+                    try:
+                        profile.sample(frames)
+                    except Exception as e:
+                        # A frame chain changing under the walk costs one sample, not the thread
+                        logger.debug(f"Dropped profile sample: {e!r}")
+
+    def start(self, method: str, path: str) -> Profile:
+        profile = Profile(next(self._ids), method, path, asyncio.current_task())
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return profile
+
+    def finish(self, profile: Profile):
+        profile.duration = time.time() - profile.started
+        with self._lock:
+            del self._active[profile.id]
+        profile.task = None
+        self.profiles.append(profile)
+
+    def select(self, profile_id: Optional[int] = None) -> List[Profile]:
+        return [profile for profile in self.profiles if profile_id is None or profile.id == profile_id]
+
+
+def collapsed_stacks(profiles: List[Profile]) -> str:
+    """Brendan Gregg's collapsed format, one "frame;frame;frame count" line per stack, rooted at the route"""
+    merged: Counter = Counter()
+    for profile in profiles:
+        for stack, count in profile.stacks.items():
+            merged[(profile.name,) + stack] += count
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(merged.items()))
+
+
+def flame_graph(profiles: List[Profile]) -> dict:
+    """Nested {name, value, children} tree, as d3-flame-graph and speedscope-style viewers take"""
+    root = {"name": "all", "value": 0, "children": {}}
+    for profile in profiles:
+        for stack, count in profile.stacks.items():
+            node = root
+            node["value"] += count
+            for frame in (profile.name,) + stack:
+                node = node["children"].setdefault(frame, {"name": frame, "value": 0, "children": {}})
+                node["value"] += count
+
+    def freeze(node: dict) -> dict:
+        node["children"] = [freeze(child) for child in node["children"].values()]
+        return node
+
+    return freeze(root)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling a sample of requests, opt-in through PROFILING_TOKEN
+
+    With no token configured it passes everything straight through. Otherwise
+    it profiles PROFILING_SAMPLE_RATE of requests at random, plus any request
+    whose X-Profile header carries the token.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rate = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+        self.token = PROFILING_TOKEN.encode()
+
+    def _selected(self, scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.token or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.start(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            profile.route = getattr(route, "path", None)
+            profiler.finish(profile)
+
+
+def authorized(token: Optional[str]) -> bool:
+    """Check a token presented to the profiles endpoint"""
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+
+# Global profiler; samples every PROFILING_INTERVAL seconds and keeps the last PROFILING_BUFFER_SIZE profiles
+profiler = SamplingProfiler(
+    interval=float(os.environ.get("PROFILING_INTERVAL", "0.005")),
+    buffer_size=int(os.environ.get("PROFILING_BUFFER_SIZE", "50"))
+)
@@ -0,0 +1,182 @@
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from metrics import RATE_LIMITED
+
+
+class TokenBucketLimiter:
+    """In-memory token buckets keyed by string, split across independent shards
+
+    Each shard is an OrderedDict in least-recently-seen order, so idle buckets
+    sit at the front. A bucket idle long enough to have refilled is
+    indistinguishable from a new one and is dropped, and each shard is capped
+    at `max_keys_per_shard`, which bounds memory under key-spraying abuse.
+    """
+
+    def __init__(self, burst: float, per_second: float, shards: int = 16, max_keys_per_shard: int = 4096):
+        self.burst = burst
+        self.per_second = per_second
+        self.max_keys_per_shard = max_keys_per_shard
+        self.idle_after = burst / per_second
+        self.shards: List[OrderedDict] = [OrderedDict() for _ in range(shards)]
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token for `key`; return 0 if allowed, else seconds until one is available"""
+        if now is None:
+            now = time.monotonic()
+        shard = self.shards[hash(key) % len(self.shards)]
+
+        bucket = shard.pop(key, None)
+        if bucket is None:
+            tokens = self.burst
+        else:
+            tokens, last = bucket
+            tokens = min(self.burst, tokens + (now - last) * self.per_second)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.per_second
+        shard[key] = (tokens, now)
+
+        # Drop buckets that have fully refilled, then enforce the size cap
+        while shard:
+            oldest_key, (_, last_seen) = next(iter(shard.items()))
+            if now - last_seen < self.idle_after and len(shard) <= self.max_keys_per_shard:
+                break
+            del shard[oldest_key]
+        return wait
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+
+class ContactRateLimitMiddleware:
+    """ASGI middleware that sheds abusive POST /api/contact traffic before validation
+
+    The client IP is checked first, from the socket address alone. Only then is
+    the body read, up to `max_body_bytes`, and its `email` field checked against
+    a second limiter; the body is replayed unchanged to the application.
+    """
+
+    def __init__(self, app, path: str = "/api/contact"):
+        self.app = app
+        self.path = path
+        self.enabled = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        # Number of trusted proxies appending to X-Forwarded-For in front of the app
+        self.proxy_hops = int(os.environ.get("RATE_LIMIT_PROXY_HOPS", "0"))
+        # A contact form submission is a few KB at most; anything larger is refused unread
+        self.max_body_bytes = int(os.environ.get("RATE_LIMIT_MAX_BODY_BYTES", "65536"))
+        self.by_ip = TokenBucketLimiter(
+            burst=float(os.environ.get("RATE_LIMIT_IP_BURST", "5")),
+            per_second=float(os.environ.get("RATE_LIMIT_IP_PER_MINUTE", "5")) / 60
+        )
+        self.by_email = TokenBucketLimiter(
+            burst=float(os.environ.get("RATE_LIMIT_EMAIL_BURST", "3")),
+            per_second=float(os.environ.get("RATE_LIMIT_EMAIL_PER_MINUTE", "2")) / 60
+        )
+
+    def _client_ip(self, scope) -> str:
+        if self.proxy_hops:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    hops = [hop.strip() for hop in value.decode("latin-1").split(",")]
+                    if len(hops) >= self.proxy_hops:
+                        return hops[-self.proxy_hops]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _content_length(self, scope) -> Optional[int]:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    async def _respond(self, send, status: int, detail: str, headers: List[tuple] = ()):
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                *headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _reject(self, send, key: str, wait: float):
+        RATE_LIMITED.inc((key,))
+        await self._respond(
+            send, 429, "Too many messages. Please try again later.",
+            [(b"retry-after", str(max(1, math.ceil(wait))).encode("ascii"))]
+        )
+
+    async def _too_large(self, send):
+        await self._respond(send, 413, f"Request body exceeds {self.max_body_bytes} bytes")
+
+    async def __call__(self, scope, receive, send):
+        if not (
+            self.enabled
+            and scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] == self.path
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.by_ip.acquire(self._client_ip(scope))
+        if wait:
+            await self._reject(send, "ip", wait)
+            return
+
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > self.max_body_bytes:
+            await self._too_large(send)
+            return
+
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away; let the application see the disconnect
+                await self.app(scope, receive, send)
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                await self._too_large(send)
+                return
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        try:
+            email = json.loads(body).get("email")
+        except (ValueError, AttributeError):
+            email = None
+        if isinstance(email, str):
+            wait = self.by_email.acquire(email.strip().lower())
+            if wait:
+                await self._reject(send, "email", wait)
+                return
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
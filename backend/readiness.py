@@ -0,0 +1,64 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+from fastapi import HTTPException
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a request arriving during warmup waits for the database before getting a 503
+READY_WAIT_TIMEOUT = float(os.environ.get("READY_WAIT_TIMEOUT", "2"))
+
+
+class Readiness:
+    """Warmup progress, so probes and routes can tell a live process from a ready one
+
+    The process is live as soon as it serves requests; portfolio routes work
+    from the static snapshot from then on. It is ready once every named check
+    has passed, and routes that need the database wait briefly for it.
+    """
+
+    CHECKS = ("database", "portfolio")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.checks: Dict[str, bool] = dict.fromkeys(self.CHECKS, False)
+        self.ready_after: Optional[float] = None
+        self._database = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return all(self.checks.values())
+
+    def mark(self, check: str):
+        self.checks[check] = True
+        if check == "database":
+            self._database.set()
+        if self.ready and self.ready_after is None:
+            self.ready_after = time.monotonic() - self.started
+            logger.info(f"Ready {self.ready_after:.2f}s after startup")
+
+    def reset(self):
+        self.__init__()
+
+    async def wait_for_database(self, timeout: float = READY_WAIT_TIMEOUT) -> bool:
+        try:
+            await asyncio.wait_for(self._database.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+async def require_database():
+    """Route dependency answering 503 while the database is still being connected"""
+    if not readiness.checks["database"] and not await readiness.wait_for_database():
+        raise HTTPException(
+            status_code=503,
+            detail="Service is starting up, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+
+# Global warmup state for this process
+readiness = Readiness()
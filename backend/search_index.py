@@ -0,0 +1,183 @@
+import heapq
+import math
+import os
+import re
+import time
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import ContactMessage
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Any script, so accented and non-Latin messages are searchable too
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Terms frequent enough that their postings would cost more to scan than they add to ranking
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it me my of on or so that the this to was we with you your".split()
+)
+
+# A term in the subject says more about a message than the same term in its body
+FIELD_WEIGHTS = {"subject": 3.0, "name": 2.0, "email": 2.0, "message": 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Relative change in average message length before cached length norms are recomputed
+NORM_DRIFT = 0.1
+
+# Per query: postings of the rarest term walked, and matches scored; past either cap only
+# the most recently indexed messages are ranked
+MAX_SCANNED = int(os.environ.get("SEARCH_MAX_SCANNED", "50000"))
+MAX_SCORED = int(os.environ.get("SEARCH_MAX_SCORED", "5000"))
+
+
+def tokenize(text: str) -> List[str]:
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if term not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """In-memory BM25 index over contact message name, email, subject and message
+
+    Postings map each term to {message ID: field-weighted term frequency}, so a
+    query only touches the postings of its own terms. A message matches when
+    it contains every query term. Postings keep indexing order, which bounds
+    the cost of common terms: matching walks them newest first and stops after
+    `max_scanned` postings or `max_scored` matches.
+    """
+
+    def __init__(self, max_scanned: int = MAX_SCANNED, max_scored: int = MAX_SCORED):
+        self.max_scanned = max_scanned
+        self.max_scored = max_scored
+        self.postings: Dict[str, Dict[str, float]] = {}
+        # Terms of each message, so it can be removed without re-reading it
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self.norms: Dict[str, float] = {}
+        self._norm_average = 0.0
+        self._pending: Optional[List[ContactMessage]] = None
+        self._pending_removals: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, message: ContactMessage):
+        """Index a message; re-adding an indexed ID is a no-op"""
+        if self._pending is not None:
+            # A rebuild is scanning the collection, make sure it sees this message too
+            self._pending.append(message)
+        if message.id in self.doc_lengths:
+            return
+
+        frequencies: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(message, field)):
+                frequencies[term] += weight
+
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[message.id] = frequency
+        self.doc_terms[message.id] = tuple(frequencies)
+        length = sum(frequencies.values())
+        self.doc_lengths[message.id] = length
+        self.total_length += length
+        if self._norm_average:
+            self.norms[message.id] = K1 * (1 - B + B * length / self._norm_average)
+
+    def remove(self, message_ids: Iterable[str]):
+        """Drop messages from the index; unknown IDs are ignored"""
+        message_ids = list(message_ids)
+        if self._pending_removals is not None:
+            # The rebuild may already have scanned them
+            self._pending_removals.extend(message_ids)
+        for message_id in message_ids:
+            terms = self.doc_terms.pop(message_id, None)
+            if terms is None:
+                continue
+            for term in terms:
+                term_postings = self.postings[term]
+                del term_postings[message_id]
+                if not term_postings:
+                    del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(message_id)
+            self.norms.pop(message_id, None)
+
+    def _refresh_norms(self):
+        """Recompute cached length norms once the average length has drifted"""
+        average = self.total_length / len(self.doc_lengths)
+        if self._norm_average and abs(average - self._norm_average) <= NORM_DRIFT * self._norm_average:
+            return
+        self._norm_average = average
+        self.norms = {
+            message_id: K1 * (1 - B + B * length / average)
+            for message_id, length in self.doc_lengths.items()
+        }
+
+    def search(self, query: str, limit: int = 20) -> Tuple[int, bool, List[Tuple[str, float]]]:
+        """Return (messages matching every term, whether that count is exact, top `limit` (message ID, score) pairs)
+
+        The count is a lower bound when matching stopped at `max_scanned` or `max_scored`.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.doc_lengths:
+            return 0, True, []
+
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return 0, True, []
+        self._refresh_norms()
+
+        # Walk the rarest term's postings newest first and probe the others, so cost follows
+        # the most selective term and stops at the caps however common the terms are
+        postings.sort(key=len)
+        matches = islice(reversed(postings[0]), self.max_scanned)
+        for other in postings[1:]:
+            matches = filter(other.__contains__, matches)
+        candidates = list(islice(matches, self.max_scored))
+        if len(postings) == 1:
+            total, exact = len(postings[0]), True
+        else:
+            exact = len(candidates) < self.max_scored and len(postings[0]) <= self.max_scanned
+            total = len(candidates)
+
+        doc_count = len(self.doc_lengths)
+        norms = self.norms
+        scores = dict.fromkeys(candidates, 0.0)
+        for term_postings in postings:
+            weight = math.log(1 + (doc_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5)) * (K1 + 1)
+            for message_id in scores:
+                frequency = term_postings[message_id]
+                scores[message_id] += weight * frequency / (frequency + norms[message_id])
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return total, exact, [(message_id, round(score, 4)) for message_id, score in top]
+
+    async def rebuild(self, db, batch_size: int = 1000):
+        """Re-index every stored message, then swap the new postings in"""
+        started = time.perf_counter()
+        self._pending, self._pending_removals = [], []
+        fresh = InvertedIndex(self.max_scanned, self.max_scored)
+        try:
+            async for message in db.iter_contact_messages(batch_size=batch_size):
+                fresh.add(message)
+            # Messages created while the scan was running
+            for message in self._pending:
+                fresh.add(message)
+            fresh.remove(self._pending_removals)
+        finally:
+            self._pending, self._pending_removals = None, None
+
+        self.postings, self.doc_terms = fresh.postings, fresh.doc_terms
+        self.doc_lengths, self.total_length = fresh.doc_lengths, fresh.total_length
+        self.norms, self._norm_average = {}, 0.0
+        logger.info(
+            f"Search index rebuilt: {len(self)} messages, {len(self.postings)} terms "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+
+# Global search index over contact messages
+search_index = InvertedIndex()
@@ -0,0 +1,64 @@
+import json
+import os
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+import logging
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder produces the same JSON, slower
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value: Any) -> Any:
+    """Encode the types the API returns that JSON has no native form for"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    # orjson encodes datetimes, str enums and tuples itself; models go through _default
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+SERIALIZERS = {"json": _json_dumps}
+if orjson is not None:
+    SERIALIZERS["orjson"] = _orjson_dumps
+
+# JSON_SERIALIZER picks an encoder by name; "auto" takes the fastest one installed
+_choice = os.environ.get("JSON_SERIALIZER", "auto")
+if _choice == "auto":
+    _choice = "orjson" if "orjson" in SERIALIZERS else "json"
+if _choice not in SERIALIZERS:
+    raise ValueError(f"Invalid JSON_SERIALIZER '{_choice}'. Must be one of: {['auto'] + list(SERIALIZERS)}")
+SERIALIZER = _choice
+dumps = SERIALIZERS[SERIALIZER]
+# Both raise a ValueError subclass on malformed input
+loads = orjson.loads if SERIALIZER == "orjson" else json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoding its content directly, models and datetimes included
+
+    Routes that return this instead of a model skip FastAPI's response
+    validation and jsonable_encoder pass; the body is encoded exactly once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,59 +1,259 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+import time
+# Import cost of the app is measured from here and logged once it is assembled
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
+import io
+import uuid
+import csv
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
-from models import ContactMessage, ContactMessageCreate, ContactMessageResponse
-from database import database
-from portfolio_data import PORTFOLIO_DATA
+from typing import Dict, List, Optional, Tuple, Union
 
 ROOT_DIR = Path(__file__).parent
+# Load settings before the local modules below, which read them at import
 load_dotenv(ROOT_DIR / '.env')
 
+from models import (
+    ContactMessage, ContactMessageCreate, ContactMessageResponse, ContactMessageSummaryPage, CONTACT_SUMMARY_FIELDS,
+    ContactMessageSearchHit, ContactMessageSearchResponse, MessageStatus,
+    BulkStatusUpdateRequest, BulkStatusUpdateResponse, ContactStats, ContactImportResponse, to_naive_utc
+)
+from database import database
+from storage import STATS_DAY_FORMAT
+from contact_writer import contact_writer
+from spool import contact_spool
+from portfolio_cache import portfolio_cache, CachedPayload, etag_matches
+from portfolio_store import portfolio_store
+from pagination import encode_cursor, decode_cursor
+from metrics import MetricsMiddleware, render_metrics
+from search_index import search_index
+from fingerprint import duplicate_detector
+from stats_reconciler import stats_reconciler
+from archiver import contact_archiver
+from readiness import readiness, require_database
+from events import event_hub, HEARTBEAT_FRAME
+from message_cache import message_cache, message_etag
+from contact_import import contact_importer
+from profiling import ProfilingMiddleware, PROFILING_TOKEN, authorized, collapsed_stacks, flame_graph, profiler
+from rate_limit import ContactRateLimitMiddleware
+from compression import CompressionMiddleware, negotiate
+from serialization import FastJSONResponse, dumps
+
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get("SSE_HEARTBEAT_INTERVAL", "15"))
+PORTFOLIO_CACHE_CONTROL = f"public, max-age={int(os.environ.get('PORTFOLIO_CACHE_MAX_AGE', '300'))}"
+
+async def _retry(description: str, operation):
+    """Await `operation()` until it succeeds, backing off between attempts"""
+    delay = 0.5
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            logging.error(f"{description} failed, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+async def rebuild_search_index():
+    try:
+        await search_index.rebuild(database)
+    except Exception as e:
+        logging.error(f"Error rebuilding search index: {e}")
+
+async def warm_duplicate_detector():
+    try:
+        await duplicate_detector.warm(database)
+    except Exception as e:
+        logging.error(f"Error loading recent message fingerprints: {e}")
+
+async def warm_up(app: FastAPI):
+    """Connect the database and load what depends on it, while requests are already served"""
+    await _retry("Database connection", database.connect)
+    readiness.mark("database")
+    contact_spool.start()
+    stats_reconciler.start(database)
+    contact_archiver.start(database)
+    # Index existing messages in the background; new ones are indexed as they arrive
+    app.state.search_rebuild = asyncio.create_task(rebuild_search_index())
+    if duplicate_detector.enabled:
+        app.state.duplicate_warm = asyncio.create_task(warm_duplicate_detector())
+    
+    # Last, so a portfolio load that keeps failing holds back none of the steps above
+    await _retry("Portfolio snapshot load", lambda: portfolio_store.load(database))
+    readiness.mark("portfolio")
+    portfolio_store.start(database)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Portfolio routes serve the pre-serialized static snapshot until warmup replaces it
+    readiness.reset()
+    contact_spool.configure()
+    await contact_writer.start()
+    warmup = asyncio.create_task(warm_up(app))
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        try:
+            await warmup
+        except asyncio.CancelledError:
+            pass
+        await portfolio_store.stop()
+        await stats_reconciler.stop()
+        await contact_archiver.stop()
+        await contact_writer.stop()
+        await contact_spool.stop()
+        await database.disconnect()
+
 # Create the main app without a prefix
 app = FastAPI(
     title="Chindhamani's Portfolio API",
     description="Backend API for portfolio website with contact form and data management",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
+# Contact routes need the database, so during warmup they wait for it or answer 503
+contact_router = APIRouter(prefix="/api", dependencies=[Depends(require_database)])
 
 # Portfolio Routes
 @api_router.get("/")
 async def root():
     return {"message": "Portfolio API is running", "status": "active"}
 
-@api_router.get("/portfolio")
-async def get_portfolio_data():
-    """Get complete portfolio data"""
-    return {
-        "success": True,
-        "data": PORTFOLIO_DATA
+def _cached_response(payload: CachedPayload, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+    """Serve a pre-serialized payload, answering 304 when the client's copy is current"""
+    encoding = negotiate(accept_encoding)
+    body, etag = payload.variant(encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": PORTFOLIO_CACHE_CONTROL,
+        "X-Portfolio-Version": str(portfolio_cache.version),
+        "Vary": "Accept-Encoding",
     }
+    if payload.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if body is not payload.body:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@api_router.get("/livez", include_in_schema=False)
+async def livez():
+    """Liveness probe: the process is up and serving"""
+    return {"status": "alive"}
+
+@api_router.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness probe: 503 until the database is connected and the portfolio snapshot loaded"""
+    return FastJSONResponse(
+        {"ready": readiness.ready, "checks": readiness.checks},
+        status_code=200 if readiness.ready else 503
+    )
+
+@api_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics: request latency per route and Database latency per method"""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@api_router.get("/portfolio")
+async def get_portfolio_data(
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """Get complete portfolio data, or only the comma-separated dotted paths in `fields`"""
+    if fields is None:
+        payload = portfolio_cache.full
+    else:
+        try:
+            payload = portfolio_cache.select(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return _cached_response(payload, if_none_match, accept_encoding)
 
 @api_router.get("/portfolio/{section}")
-async def get_portfolio_section(section: str):
+async def get_portfolio_section(
+    section: str,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
     """Get specific portfolio section data"""
-    if section not in PORTFOLIO_DATA:
+    payload = portfolio_cache.section(section)
+    if payload is None:
         raise HTTPException(status_code=404, detail=f"Section '{section}' not found")
     
-    return {
-        "success": True,
-        "section": section,
-        "data": PORTFOLIO_DATA[section]
-    }
+    return _cached_response(payload, if_none_match, accept_encoding)
+
+@api_router.get("/debug/profiles", include_in_schema=False)
+async def get_profiles(
+    format: str = "json",
+    profile: Optional[int] = None,
+    x_profile_token: Optional[str] = Header(None)
+):
+    """Recently profiled requests: summaries (json), collapsed stacks, or a flame graph tree"""
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not authorized(x_profile_token):
+        raise HTTPException(status_code=401, detail="Invalid profiling token")
+    
+    profiles = profiler.select(profile)
+    if format == "json":
+        return FastJSONResponse([profile.summary() for profile in profiles])
+    if format == "collapsed":
+        return Response(content=collapsed_stacks(profiles), media_type="text/plain; charset=utf-8")
+    if format == "flamegraph":
+        return FastJSONResponse(flame_graph(profiles))
+    raise HTTPException(status_code=400, detail="format must be one of: json, collapsed, flamegraph")
+
+async def require_contact_storage():
+    """Route dependency for submissions: with a spool they are journaled while the database is unreachable"""
+    if not contact_spool.enabled:
+        await require_database()
 
 # Contact Form Routes
-@api_router.post("/contact", response_model=ContactMessageResponse)
-async def create_contact_message(message_data: ContactMessageCreate):
+@api_router.post("/contact", response_model=ContactMessageResponse, dependencies=[Depends(require_contact_storage)])
+async def create_contact_message(message_data: ContactMessageCreate, durable: bool = False):
     """Submit a new contact form message"""
     try:
-        # Create contact message in database
-        contact_message = await database.create_contact_message(message_data)
+        fingerprint, duplicate_of = None, None
+        if duplicate_detector.enabled:
+            fingerprint, duplicate_of = duplicate_detector.check(message_data.subject, message_data.message)
+            if duplicate_of is not None and duplicate_detector.action == "drop":
+                # Answer as if stored so repeat senders learn nothing. The original may be
+                # someone else's message, so its ID is never revealed
+                return ContactMessageResponse(
+                    success=True,
+                    message="Thank you for your message! I'll get back to you soon.",
+                    contact_id=str(uuid.uuid4())
+                )
+
+        if contact_writer.enabled:
+            # Queue for a batched write; `durable` waits for the flush before replying
+            contact_message = ContactMessage(**message_data.dict(), duplicate_of=duplicate_of)
+            await contact_writer.submit(contact_message, wait=durable)
+        elif contact_spool.enabled:
+            # Written through, or journaled to disk while the database is failing
+            contact_message = ContactMessage(**message_data.dict(), duplicate_of=duplicate_of)
+            await contact_spool.store([contact_message])
+        else:
+            # Create contact message in database
+            contact_message = await database.create_contact_message(message_data, duplicate_of=duplicate_of)
+        
+        search_index.add(contact_message)
+        if fingerprint is not None:
+            duplicate_detector.remember(fingerprint, contact_message)
+        event_hub.publish("message.created", contact_message)
         
         return ContactMessageResponse(
             success=True,
@@ -68,12 +268,112 @@ async def create_contact_message(message_data: ContactMessageCreate):
             detail="Failed to send message. Please try again later."
         )
 
-@api_router.get("/contact/messages", response_model=List[ContactMessage])
-async def get_contact_messages(limit: int = 50, skip: int = 0):
-    """Get all contact messages (admin endpoint)"""
+@contact_router.post("/contact/import", response_model=ContactImportResponse)
+async def import_contact_messages(request: Request):
+    """Bulk-load contact messages from a streamed NDJSON body, one ContactMessageImport per line"""
+    try:
+        result = await contact_importer.run(database, request.stream())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error importing contact messages: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to import messages"
+        )
+    
+    if result.imported:
+        # Too many for one event each; subscribers refetch through the REST API
+        event_hub.publish("messages.imported", {"imported": result.imported})
+    return FastJSONResponse(result)
+
+@contact_router.get("/contact/stats", response_model=ContactStats)
+async def get_contact_stats(days: int = Query(30, ge=0, le=3650)):
+    """Message counts by status and per-day submission volume for the last `days` days (0 for all, at most 3650)"""
+    try:
+        stats = await database.get_contact_stats()
+        if days > 0:
+            # Calendar days up to today (UTC); days without messages have no key
+            first_day = (datetime.utcnow().date() - timedelta(days=days - 1)).strftime(STATS_DAY_FORMAT)
+            stats.by_day = {day: count for day, count in stats.by_day.items() if day >= first_day}
+        return FastJSONResponse(stats)
+    except Exception as e:
+        logging.error(f"Error retrieving contact stats: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve stats"
+        )
+
+def _page_cursor_headers(
+    first: Tuple[datetime, str],
+    last: Tuple[datetime, str],
+    count: int,
+    limit: int,
+    skip: int,
+    before: Optional[str],
+    after: Optional[str]
+) -> Dict[str, str]:
+    """Cursor headers for a non-empty page whose first and last rows have the given (created_at, id)"""
+    headers = {}
+    if count == limit or after:
+        headers["X-Next-Cursor"] = encode_cursor(*last)
+    if before or skip or (after and count == limit):
+        headers["X-Prev-Cursor"] = encode_cursor(*first)
+    return headers
+
+@contact_router.get("/contact/messages", response_model=Union[List[ContactMessage], ContactMessageSummaryPage])
+async def get_contact_messages(
+    limit: int = 50,
+    skip: int = 0,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    view: str = "full"
+):
+    """Get all contact messages (admin endpoint)
+
+    Pass the X-Next-Cursor header of a page as `before` to get the next (older)
+    page, or X-Prev-Cursor as `after` to get the previous (newer) one.
+    `view=summary` returns `{"fields": [...], "rows": [[...], ...]}` without
+    message bodies.
+    """
+    if view not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="Invalid view. Must be one of: ['full', 'summary']")
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
     try:
-        messages = await database.get_contact_messages(limit=limit, skip=skip)
-        return messages
+        before_key = decode_cursor(before) if before else None
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        if view == "summary":
+            rows = await database.get_contact_message_summaries(
+                limit=limit, skip=skip, before=before_key, after=after_key
+            )
+            headers = {}
+            if rows:
+                id_index = CONTACT_SUMMARY_FIELDS.index("id")
+                created_at_index = CONTACT_SUMMARY_FIELDS.index("created_at")
+                headers = _page_cursor_headers(
+                    (rows[0][created_at_index], rows[0][id_index]),
+                    (rows[-1][created_at_index], rows[-1][id_index]),
+                    len(rows), limit, skip, before, after
+                )
+            return FastJSONResponse({"fields": CONTACT_SUMMARY_FIELDS, "rows": rows}, headers=headers)
+        
+        messages = await database.get_contact_messages(
+            limit=limit, skip=skip, before=before_key, after=after_key
+        )
+        headers = {}
+        if messages:
+            headers = _page_cursor_headers(
+                (messages[0].created_at, messages[0].id),
+                (messages[-1].created_at, messages[-1].id),
+                len(messages), limit, skip, before, after
+            )
+        
+        return FastJSONResponse(messages, headers=headers)
     except Exception as e:
         logging.error(f"Error retrieving contact messages: {e}")
         raise HTTPException(
@@ -81,14 +381,143 @@ async def get_contact_messages(limit: int = 50, skip: int = 0):
             detail="Failed to retrieve messages"
         )
 
-@api_router.get("/contact/messages/{message_id}", response_model=ContactMessage)
-async def get_contact_message(message_id: str):
-    """Get a specific contact message"""
+@contact_router.get("/contact/messages/search", response_model=ContactMessageSearchResponse)
+async def search_contact_messages(q: str, limit: int = 20):
+    """Rank contact messages by relevance to `q` across name, email, subject and message"""
+    try:
+        total, total_exact, hits = search_index.search(q, limit=limit)
+        messages = {
+            message.id: message
+            for message in await database.get_contact_messages_by_ids([message_id for message_id, _ in hits])
+        }
+        
+        return FastJSONResponse(ContactMessageSearchResponse(
+            query=q,
+            total=total,
+            total_exact=total_exact,
+            results=[
+                ContactMessageSearchHit(score=score, message=messages[message_id])
+                for message_id, score in hits
+                if message_id in messages
+            ]
+        ))
+    except Exception as e:
+        logging.error(f"Error searching contact messages: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to search messages"
+        )
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_COLUMNS = ("id", "name", "email", "subject", "message", "created_at", "status", "duplicate_of")
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "500"))
+
+async def _export_chunks(format: str, status: Optional[str], since: Optional[datetime], until: Optional[datetime]):
+    """Encode messages from the database cursor one batch at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    lines: List[bytes] = []
+    if format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    def drain() -> bytes:
+        if format == "csv":
+            chunk = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        else:
+            chunk = b"".join(lines)
+            lines.clear()
+        return chunk
+
+    rows = 0
+    try:
+        async for message in database.iter_contact_messages(
+            batch_size=EXPORT_BATCH_SIZE, status=status, since=since, until=until
+        ):
+            if format == "csv":
+                record = message.dict()
+                writer.writerow([
+                    record[column].isoformat() if column == "created_at" else record[column]
+                    for column in EXPORT_COLUMNS
+                ])
+            else:
+                lines.append(dumps(message) + b"\n")
+            rows += 1
+            if rows % EXPORT_BATCH_SIZE == 0:
+                yield drain()
+        yield drain()
+    except Exception as e:
+        # Headers are already sent, so the best we can do is end the stream early
+        logging.error(f"Error exporting contact messages after {rows} rows: {e}")
+        raise
+
+@contact_router.get("/contact/messages/export")
+async def export_contact_messages(
+    format: str = "ndjson",
+    status: Optional[MessageStatus] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Stream every matching contact message, oldest first, as NDJSON or CSV"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {list(EXPORT_FORMATS)}")
+    
+    # Offsets are resolved here: once streaming starts, a failure can only truncate the body
+    since, until = to_naive_utc(since), to_naive_utc(until)
+    filename = f"contact-messages-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{format}"
+    return StreamingResponse(
+        _export_chunks(format, status.value if status else None, since, until),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def _event_stream(last_event_id: Optional[int]):
+    subscription = event_hub.subscribe(last_event_id)
     try:
-        message = await database.get_contact_message_by_id(message_id)
+        # Reconnect quickly after a dropped connection; Last-Event-ID picks up where it stopped
+        yield b"retry: 3000\n\n"
+        while True:
+            events = await subscription.next_batch(SSE_HEARTBEAT_INTERVAL)
+            if events is None:
+                # Fell too far behind; closing makes the client resume from history
+                return
+            yield b"".join(event.frame for event in events) if events else HEARTBEAT_FRAME
+    finally:
+        event_hub.unsubscribe(subscription)
+
+@contact_router.get("/contact/messages/stream")
+async def stream_contact_messages(last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events feed of new messages (`message.created`) and status changes (`message.status`)
+
+    A `reset` event means events may have been missed; refetch through the
+    listing endpoint.
+    """
+    try:
+        after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    
+    return StreamingResponse(
+        _event_stream(after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@contact_router.get("/contact/messages/{message_id}", response_model=ContactMessage)
+async def get_contact_message(message_id: str, if_none_match: Optional[str] = Header(None)):
+    """Get a specific contact message, answering 304 when the client's copy is current"""
+    try:
+        message = await message_cache.get(message_id, database.get_contact_message_by_id)
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
-        return message
+        
+        etag = message_etag(message)
+        # Status changes must be seen promptly, so clients always revalidate
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, {etag}):
+            return Response(status_code=304, headers=headers)
+        return FastJSONResponse(message, headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -98,11 +527,11 @@ async def get_contact_message(message_id: str):
             detail="Failed to retrieve message"
         )
 
-@api_router.patch("/contact/messages/{message_id}/status")
+@contact_router.patch("/contact/messages/{message_id}/status")
 async def update_message_status(message_id: str, status: str):
     """Update message status (read/unread/replied)"""
     try:
-        valid_statuses = ["unread", "read", "replied"]
+        valid_statuses = [member.value for member in MessageStatus]
         if status not in valid_statuses:
             raise HTTPException(
                 status_code=400,
@@ -110,8 +539,10 @@ async def update_message_status(message_id: str, status: str):
             )
         
         success = await database.update_message_status(message_id, status)
+        message_cache.invalidate(message_id)
         if not success:
             raise HTTPException(status_code=404, detail="Message not found")
+        event_hub.publish("message.status", {"statuses": {message_id: status}})
         
         return {"success": True, "message": f"Status updated to {status}"}
         
@@ -124,25 +555,67 @@ async def update_message_status(message_id: str, status: str):
             detail="Failed to update message status"
         )
 
-# Include the router in the main app
-app.include_router(api_router)
+# Largest number of status changes sent to the database in one batch
+BULK_STATUS_BATCH_SIZE = 1000
 
-# Database connection setup
-@app.on_event("startup")
-async def startup_db_client():
-    await database.connect()
+@contact_router.patch("/contact/messages/status", response_model=BulkStatusUpdateResponse)
+async def bulk_update_message_status(request: BulkStatusUpdateRequest):
+    """Update many message statuses at once, by explicit (message_id, status) pairs or by filter"""
+    try:
+        if request.updates is not None:
+            # Later entries for the same ID win
+            updates = {update.message_id: update.status.value for update in request.updates}
+        else:
+            message_ids = await database.get_contact_message_ids(
+                status=request.filter.status.value if request.filter.status else None,
+                since=request.filter.since,
+                until=request.filter.until
+            )
+            updates = dict.fromkeys(message_ids, request.status.value)
+        
+        results = {}
+        items = list(updates.items())
+        for start in range(0, len(items), BULK_STATUS_BATCH_SIZE):
+            results.update(await database.update_message_statuses(dict(items[start:start + BULK_STATUS_BATCH_SIZE])))
+        
+        changed = {message_id: updates[message_id] for message_id, outcome in results.items() if outcome == "updated"}
+        for message_id in changed:
+            message_cache.invalidate(message_id)
+        if changed:
+            event_hub.publish("message.status", {"statuses": changed})
+        
+        return FastJSONResponse(BulkStatusUpdateResponse(
+            success=True,
+            updated=sum(1 for outcome in results.values() if outcome == "updated"),
+            results=results
+        ))
+        
+    except Exception as e:
+        logging.error(f"Error bulk updating message statuses: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to update message statuses"
+        )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await database.disconnect()
+# Include the router in the main app
+app.include_router(api_router)
+app.include_router(contact_router)
 
+# Innermost, so rejected requests still get CORS headers and metrics
+app.add_middleware(ContactRateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Prev-Cursor", "X-Portfolio-Version"],
 )
+# Compresses what the layers inside produce; inside metrics so its cost shows in request latency
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so a profile covers every layer of the request
+app.add_middleware(ProfilingMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -150,5 +623,4 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-
+logger.info(f"Application imported in {(time.perf_counter() - IMPORT_STARTED) * 1000:.0f}ms")
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+from models import ContactMessage
+from database import database
+from readiness import readiness
+from metrics import SPOOL_EVENTS
+from serialization import dumps
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while instead of waiting on it every time
+
+    Closed: calls go through. After `failure_threshold` consecutive failures it
+    opens and calls are refused for `reset_timeout` seconds, after which one
+    trial call is let through (half-open); its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("Circuit closed: database writes are succeeding again")
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit opened after {self.failures} consecutive database write failures")
+            self.opened_at = time.monotonic()
+
+
+class ContactSpool:
+    """Writes contact messages to the database, or to a local journal when it is unhealthy
+
+    Writes are bounded by `write_timeout` and guarded by a circuit breaker, so
+    a slow or unreachable database costs a visitor one append to an
+    append-only NDJSON journal instead of a hung request or a 500. A
+    background task replays the journal in batches once writes succeed
+    again. Messages keep their IDs in the journal, so a message that reached
+    the database before its write timed out is recognised and skipped.
+
+    Until warmup has connected the database, submissions go straight to the
+    journal. Spooling is off unless CONTACT_SPOOL_DIR names a writable
+    directory.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.directory: Optional[Path] = None
+        self.write_timeout = 2.0
+        self.replay_batch_size = 500
+        self.replay_interval = 5.0
+        self.fsync = True
+        self.breaker = CircuitBreaker()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    @property
+    def journal_path(self) -> Path:
+        return self.directory / "contacts.ndjson"
+
+    @property
+    def replay_path(self) -> Path:
+        # The journal is renamed here before replay so new appends start a fresh file
+        return self.directory / "contacts.replaying.ndjson"
+
+    def configure(self):
+        """Read the spool settings; spooling stays off while CONTACT_SPOOL_DIR is unset or empty"""
+        directory = os.environ.get("CONTACT_SPOOL_DIR", "")
+        if not directory:
+            self.directory = None
+            return
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.write_timeout = float(os.environ.get("CONTACT_SPOOL_WRITE_TIMEOUT", "2"))
+        self.replay_batch_size = int(os.environ.get("CONTACT_SPOOL_REPLAY_BATCH_SIZE", "500"))
+        self.replay_interval = float(os.environ.get("CONTACT_SPOOL_REPLAY_INTERVAL", "5"))
+        self.fsync = os.environ.get("CONTACT_SPOOL_FSYNC", "true").lower() == "true"
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get("CONTACT_SPOOL_FAILURE_THRESHOLD", "3")),
+            reset_timeout=float(os.environ.get("CONTACT_SPOOL_RESET_TIMEOUT", "30"))
+        )
+
+    async def store(self, messages: List[ContactMessage]) -> bool:
+        """Write messages to the database or the journal; True if they were journaled"""
+        if readiness.checks["database"] and self.breaker.allow():
+            try:
+                await asyncio.wait_for(self.db.create_contact_messages(messages), self.write_timeout)
+                self.breaker.record_success()
+                return False
+            except Exception as e:
+                self.breaker.record_failure()
+                logger.error(f"Database write failed, spooling {len(messages)} contact messages: {e!r}")
+
+        await self.append(messages)
+        return True
+
+    def _append_lines(self, data: bytes):
+        with open(self.journal_path, "ab") as journal:
+            journal.write(data)
+            journal.flush()
+            if self.fsync:
+                os.fsync(journal.fileno())
+
+    async def append(self, messages: List[ContactMessage]):
+        data = b"".join(dumps(message) + b"\n" for message in messages)
+        async with self._lock:
+            await asyncio.to_thread(self._append_lines, data)
+        SPOOL_EVENTS.inc(("spooled",), len(messages))
+
+    def _read_replay_batch(self, journal: BinaryIO, line_number: int) -> Tuple[List[ContactMessage], int]:
+        """Read the next batch from the open replay journal; an empty batch means it is exhausted"""
+        batch = []
+        while len(batch) < self.replay_batch_size:
+            line = journal.readline()
+            if not line:
+                break
+            line_number += 1
+            try:
+                batch.append(ContactMessage(**json.loads(line)))
+            except ValueError as e:
+                # A torn final line from a crash mid-append; everything before it is intact
+                logger.error(f"Skipping unreadable spool line {line_number}: {e}")
+        return batch, line_number
+
+    async def _write_batch(self, batch: List[ContactMessage]):
+        try:
+            await self.db.create_contact_messages(batch)
+        except Exception:
+            # Duplicate IDs are messages an earlier attempt already wrote; anything else is a real failure
+            message_ids = {message.id for message in batch}
+            stored = await self.db.get_contact_messages_by_ids(list(message_ids))
+            if len(stored) < len(message_ids):
+                raise
+
+    def has_pending(self) -> bool:
+        return self.replay_path.exists() or (self.journal_path.exists() and self.journal_path.stat().st_size > 0)
+
+    async def replay(self) -> int:
+        """Move the journal aside and write it to the database, returning how many messages were replayed"""
+        async with self._lock:
+            if not self.has_pending():
+                return 0
+            if not self.replay_path.exists():
+                os.replace(self.journal_path, self.replay_path)
+
+        replayed, line_number = 0, 0
+        # One batch in memory at a time, however long the outage was
+        with open(self.replay_path, "rb") as journal:
+            while True:
+                batch, line_number = await asyncio.to_thread(self._read_replay_batch, journal, line_number)
+                if not batch:
+                    break
+                await self._write_batch(batch)
+                replayed += len(batch)
+                SPOOL_EVENTS.inc(("replayed",), len(batch))
+        self.replay_path.unlink()
+        logger.info(f"Replayed {replayed} spooled contact messages")
+        return replayed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.replay_interval)
+            if not self.has_pending() or not self.breaker.allow():
+                continue
+            try:
+                await self.replay()
+                self.breaker.record_success()
+            except Exception as e:
+                self.breaker.record_failure()
+                logger.error(f"Error replaying contact spool: {e!r}")
+
+    def start(self):
+        """Start replaying the journal, including anything left from a previous run"""
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global spool for contact submissions
+contact_spool = ContactSpool(database)
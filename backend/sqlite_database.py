@@ -0,0 +1,548 @@
+import aiosqlite
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from datetime import datetime
+from models import ContactMessage, ContactMessageCreate, ContactStats, PortfolioConfig, CONTACT_SUMMARY_FIELDS
+from storage import BaseDatabase, portfolio_configs, stats_from_counters
+from metrics import timed
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTACT_COLUMNS = ("id", "name", "email", "subject", "message", "created_at", "status", "duplicate_of")
+CONTACT_PLACEHOLDERS = ", ".join("?" * len(CONTACT_COLUMNS))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duplicate_of TEXT
+);
+CREATE INDEX IF NOT EXISTS contacts_created_at_id ON contacts (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS contacts_status_created_at ON contacts (status, created_at DESC);
+-- Old replied messages moved out of contacts by the archiver, still found by ID
+CREATE TABLE IF NOT EXISTS contacts_archive (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duplicate_of TEXT
+);
+-- Inbox counters under dotted keys ("total", "status.<status>", "days.<YYYY-MM-DD>"),
+-- maintained by triggers in the same transaction as the message writes
+CREATE TABLE IF NOT EXISTS contact_stats (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS contacts_stats_insert AFTER INSERT ON contacts BEGIN
+    INSERT INTO contact_stats (key, count)
+    VALUES ('total', 1), ('status.' || NEW.status, 1), ('days.' || substr(NEW.created_at, 1, 10), 1)
+    ON CONFLICT (key) DO UPDATE SET count = count + excluded.count;
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_stats_status AFTER UPDATE OF status ON contacts
+WHEN OLD.status != NEW.status BEGIN
+    INSERT INTO contact_stats (key, count)
+    VALUES ('status.' || OLD.status, -1), ('status.' || NEW.status, 1)
+    ON CONFLICT (key) DO UPDATE SET count = count + excluded.count;
+END;
+CREATE TABLE IF NOT EXISTS portfolio_config (
+    section TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    last_updated TEXT NOT NULL
+);
+"""
+
+# Fixed-width timestamps so that text order matches chronological order
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def _to_text(value: datetime) -> str:
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def _from_text(value: str) -> datetime:
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+class SQLiteDatabase(BaseDatabase):
+    """Single-file SQLite storage for local runs and edge deployments"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[aiosqlite.Connection] = None
+
+    async def connect(self):
+        """Initialize database connection"""
+        try:
+            self.conn = await aiosqlite.connect(self.path)
+            await self.conn.execute("PRAGMA journal_mode=WAL")
+            await self.conn.execute("PRAGMA synchronous=NORMAL")
+            await self.conn.executescript(SCHEMA)
+            await self._migrate()
+            await self.conn.commit()
+            logger.info(f"Successfully connected to SQLite at {self.path}")
+
+        except Exception as e:
+            logger.error(f"Failed to open SQLite database {self.path}: {e}")
+            raise
+
+    async def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+            logger.info("Disconnected from SQLite")
+
+    async def _migrate(self):
+        """Add columns introduced after a database file was created"""
+        async with self.conn.execute("PRAGMA table_info(contacts)") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        if "duplicate_of" not in existing:
+            await self.conn.execute("ALTER TABLE contacts ADD COLUMN duplicate_of TEXT")
+
+        # Counters start empty on files written before the stats triggers existed
+        async with self.conn.execute("SELECT EXISTS (SELECT 1 FROM contact_stats)") as cursor:
+            (has_stats,) = await cursor.fetchone()
+        if not has_stats:
+            await self._recount_stats()
+
+    @staticmethod
+    def _row(message: ContactMessage) -> tuple:
+        return (
+            message.id, message.name, message.email, message.subject,
+            message.message, _to_text(message.created_at), message.status, message.duplicate_of
+        )
+
+    @staticmethod
+    def _message(row) -> ContactMessage:
+        values = dict(zip(CONTACT_COLUMNS, row))
+        values["created_at"] = _from_text(values["created_at"])
+        return ContactMessage(**values)
+
+    @staticmethod
+    def _keyset_query(
+        before: Optional[Tuple[datetime, str]],
+        after: Optional[Tuple[datetime, str]]
+    ) -> Tuple[str, tuple, str]:
+        """WHERE clause, parameters and sort direction for a keyset page"""
+        if before is not None:
+            created_at, message_id = before
+            return "WHERE (created_at, id) < (?, ?)", (_to_text(created_at), message_id), "DESC"
+        if after is not None:
+            created_at, message_id = after
+            return "WHERE (created_at, id) > (?, ?)", (_to_text(created_at), message_id), "ASC"
+        return "", (), "DESC"
+
+    async def _page(
+        self,
+        columns: Tuple[str, ...],
+        limit: int,
+        skip: int,
+        before: Optional[Tuple[datetime, str]],
+        after: Optional[Tuple[datetime, str]]
+    ) -> list:
+        where, params, order = self._keyset_query(before, after)
+        query = (
+            f"SELECT {', '.join(columns)} FROM contacts {where} "
+            f"ORDER BY created_at {order}, id {order} LIMIT ? OFFSET ?"
+        )
+        async with self.conn.execute(query, params + (limit, skip)) as cursor:
+            rows = await cursor.fetchall()
+        if after is not None:
+            rows.reverse()
+        return rows
+
+    # Contact Message Operations
+    @timed("insert")
+    async def create_contact_message(
+        self,
+        message_data: ContactMessageCreate,
+        duplicate_of: Optional[str] = None
+    ) -> ContactMessage:
+        """Create a new contact message"""
+        try:
+            contact_message = ContactMessage(**message_data.dict(), duplicate_of=duplicate_of)
+            await self.conn.execute(
+                f"INSERT INTO contacts ({', '.join(CONTACT_COLUMNS)}) VALUES ({CONTACT_PLACEHOLDERS})",
+                self._row(contact_message)
+            )
+            await self.conn.commit()
+
+            logger.info(f"Contact message created with ID: {contact_message.id}")
+            return contact_message
+
+        except Exception as e:
+            logger.error(f"Error creating contact message: {e}")
+            raise
+
+    @timed("insert")
+    async def create_contact_messages(self, messages: List[ContactMessage]) -> int:
+        """Insert a batch of already-built contact messages in one transaction"""
+        try:
+            if not messages:
+                return 0
+
+            # Like an unordered insert_many: write everything that fits, then report duplicates
+            # rowcount, unlike total_changes, leaves out the rows written by the stats triggers
+            cursor = await self.conn.executemany(
+                f"INSERT OR IGNORE INTO contacts ({', '.join(CONTACT_COLUMNS)}) VALUES ({CONTACT_PLACEHOLDERS})",
+                [self._row(message) for message in messages]
+            )
+            await self.conn.commit()
+            inserted = cursor.rowcount
+
+            if inserted < len(messages):
+                raise ValueError(f"{len(messages) - inserted} duplicate contact message IDs in batch")
+
+            logger.info(f"Inserted batch of {inserted} contact messages")
+            return inserted
+
+        except Exception as e:
+            logger.error(f"Error inserting contact message batch: {e}")
+            raise
+
+    @timed("find")
+    async def get_contact_messages(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[ContactMessage]:
+        """Retrieve contact messages newest first, paginated by skip/limit or by a (created_at, id) keyset"""
+        try:
+            rows = await self._page(CONTACT_COLUMNS, limit, skip, before, after)
+            return [self._message(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error retrieving contact messages: {e}")
+            raise
+
+    @timed("find")
+    async def get_contact_message_summaries(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[tuple]:
+        """Retrieve CONTACT_SUMMARY_FIELDS rows only, paginated like get_contact_messages"""
+        try:
+            rows = await self._page(CONTACT_SUMMARY_FIELDS, limit, skip, before, after)
+            created_at_index = CONTACT_SUMMARY_FIELDS.index("created_at")
+            return [
+                row[:created_at_index] + (_from_text(row[created_at_index]),) + row[created_at_index + 1:]
+                for row in rows
+            ]
+
+        except Exception as e:
+            logger.error(f"Error retrieving contact message summaries: {e}")
+            raise
+
+    @timed("find")
+    async def get_contact_message_by_id(self, message_id: str) -> Optional[ContactMessage]:
+        """Get a specific contact message by ID, falling back to the archive"""
+        try:
+            columns = ", ".join(CONTACT_COLUMNS)
+            async with self.conn.execute(
+                f"SELECT {columns} FROM contacts WHERE id = ? "
+                f"UNION ALL SELECT {columns} FROM contacts_archive WHERE id = ? LIMIT 1",
+                (message_id, message_id)
+            ) as cursor:
+                row = await cursor.fetchone()
+            return self._message(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Error retrieving contact message {message_id}: {e}")
+            raise
+
+    @timed("find")
+    async def get_contact_messages_by_ids(self, message_ids: List[str]) -> List[ContactMessage]:
+        """Get the contact messages with the given IDs, falling back to the archive"""
+        try:
+            if not message_ids:
+                return []
+            columns = ", ".join(CONTACT_COLUMNS)
+            placeholders = ", ".join("?" for _ in message_ids)
+            # Coroutines share the connection, so this can run between an archive batch's copy
+            # and its delete and find a message in both tables; the live row wins
+            async with self.conn.execute(
+                f"SELECT {columns} FROM contacts WHERE id IN ({placeholders}) "
+                f"UNION ALL SELECT {columns} FROM contacts_archive WHERE id IN ({placeholders})",
+                message_ids + message_ids
+            ) as cursor:
+                rows = await cursor.fetchall()
+            unique = {}
+            for row in rows:
+                unique.setdefault(row[0], row)
+            return [self._message(row) for row in unique.values()]
+
+        except Exception as e:
+            logger.error(f"Error retrieving contact messages by ID: {e}")
+            raise
+
+    async def iter_contact_messages(
+        self,
+        batch_size: int = 500,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> AsyncIterator[ContactMessage]:
+        """Yield matching contact messages oldest first, one keyset-paginated batch at a time"""
+        where, params = self._filter_clause(status, since, until)
+        keyset, keyset_params = "", ()
+        while True:
+            async with self.conn.execute(
+                f"SELECT {', '.join(CONTACT_COLUMNS)} FROM contacts {where} {keyset} "
+                f"ORDER BY created_at, id LIMIT ?",
+                params + keyset_params + (batch_size,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._message(row)
+            keyset = ("AND" if where else "WHERE") + " (created_at, id) > (?, ?)"
+            keyset_params = (rows[-1][5], rows[-1][0])
+
+    @timed("update")
+    async def update_message_status(self, message_id: str, status: str) -> bool:
+        """Update the status of a contact message"""
+        try:
+            cursor = await self.conn.execute(
+                "UPDATE contacts SET status = ? WHERE id = ? AND status != ?",
+                (status, message_id, status)
+            )
+            await self.conn.commit()
+            return cursor.rowcount > 0
+
+        except Exception as e:
+            logger.error(f"Error updating message status: {e}")
+            raise
+
+    @timed("update")
+    async def update_message_statuses(self, updates: Dict[str, str]) -> Dict[str, str]:
+        """Apply many status changes in one transaction"""
+        try:
+            current = {}
+            message_ids = list(updates)
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(message_ids), 500):
+                chunk = message_ids[start:start + 500]
+                async with self.conn.execute(
+                    f"SELECT id, status FROM contacts WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+                ) as cursor:
+                    current.update(await cursor.fetchall())
+
+            results = {}
+            changes = []
+            for message_id, status in updates.items():
+                if message_id not in current:
+                    results[message_id] = "not_found"
+                elif current[message_id] == status:
+                    results[message_id] = "unchanged"
+                else:
+                    results[message_id] = "updated"
+                    changes.append((status, message_id))
+
+            if changes:
+                await self.conn.executemany("UPDATE contacts SET status = ? WHERE id = ?", changes)
+                await self.conn.commit()
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error bulk updating message statuses: {e}")
+            raise
+
+    @staticmethod
+    def _filter_clause(
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[str, tuple]:
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(_to_text(since))
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(_to_text(until))
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
+
+    @timed("find")
+    async def get_contact_message_ids(
+        self,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[str]:
+        """IDs of the messages matching a status and created_at range"""
+        try:
+            where, params = self._filter_clause(status, since, until)
+            async with self.conn.execute(f"SELECT id FROM contacts {where}", params) as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Error retrieving contact message IDs: {e}")
+            raise
+
+    @timed("archive")
+    async def archive_contact_messages(self, status: str, created_before: datetime, limit: int) -> List[str]:
+        """Copy one batch to contacts_archive, then delete it from contacts, and commit
+
+        Other coroutines share the connection, so they can run between the copy
+        and the delete, and a commit of theirs can land the copy on its own. The
+        copy ignores rows already archived, so a later run finishes such a
+        move, and lookups by ID return a message once even while it is in both
+        tables. There is no delete trigger, so the inbox counters keep counting
+        archived messages.
+        """
+        try:
+            async with self.conn.execute(
+                "SELECT id FROM contacts WHERE status = ? AND created_at < ? ORDER BY created_at, id LIMIT ?",
+                (status, _to_text(created_before), limit)
+            ) as cursor:
+                message_ids = [row[0] for row in await cursor.fetchall()]
+            if not message_ids:
+                return []
+
+            placeholders = ", ".join("?" for _ in message_ids)
+            columns = ", ".join(CONTACT_COLUMNS)
+            await self.conn.execute(
+                f"INSERT OR IGNORE INTO contacts_archive ({columns}) "
+                f"SELECT {columns} FROM contacts WHERE id IN ({placeholders})",
+                message_ids
+            )
+            await self.conn.execute(f"DELETE FROM contacts WHERE id IN ({placeholders})", message_ids)
+            await self.conn.commit()
+            return message_ids
+
+        except Exception as e:
+            await self.conn.rollback()
+            logger.error(f"Error archiving contact messages: {e}")
+            raise
+
+    async def _recount_stats(self):
+        everything = (
+            "(SELECT status, created_at FROM contacts "
+            "UNION ALL SELECT status, created_at FROM contacts_archive)"
+        )
+        await self.conn.execute("DELETE FROM contact_stats")
+        await self.conn.execute(
+            f"INSERT INTO contact_stats (key, count) SELECT 'total', COUNT(*) FROM {everything}"
+        )
+        await self.conn.execute(
+            "INSERT INTO contact_stats (key, count) "
+            f"SELECT 'status.' || status, COUNT(*) FROM {everything} GROUP BY status"
+        )
+        await self.conn.execute(
+            "INSERT INTO contact_stats (key, count) "
+            f"SELECT 'days.' || substr(created_at, 1, 10), COUNT(*) FROM {everything} "
+            "GROUP BY substr(created_at, 1, 10)"
+        )
+
+    async def _read_stats(self) -> ContactStats:
+        async with self.conn.execute("SELECT key, count FROM contact_stats") as cursor:
+            return stats_from_counters(dict(await cursor.fetchall()))
+
+    @timed("find")
+    async def get_contact_stats(self) -> ContactStats:
+        """Inbox counters from the trigger-maintained contact_stats table"""
+        try:
+            return await self._read_stats()
+
+        except Exception as e:
+            logger.error(f"Error retrieving contact stats: {e}")
+            raise
+
+    @timed("find")
+    async def reconcile_contact_stats(self) -> ContactStats:
+        """Recount contact_stats from the contacts table in one transaction"""
+        try:
+            await self._recount_stats()
+            await self.conn.commit()
+            return await self._read_stats()
+
+        except Exception as e:
+            logger.error(f"Error reconciling contact stats: {e}")
+            raise
+
+    # Portfolio Configuration Operations
+    @timed("find")
+    async def get_portfolio_section(self, section: str) -> Optional[PortfolioConfig]:
+        """Get portfolio configuration for a specific section"""
+        try:
+            async with self.conn.execute(
+                "SELECT id, section, data, last_updated FROM portfolio_config WHERE section = ?", (section,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if not row:
+                return None
+            config_id, section, data, last_updated = row
+            return PortfolioConfig(
+                id=config_id, section=section, data=json.loads(data), last_updated=_from_text(last_updated)
+            )
+
+        except Exception as e:
+            logger.error(f"Error retrieving portfolio section {section}: {e}")
+            raise
+
+    @timed("update")
+    async def update_portfolio_section(self, section: str, data: Union[dict, list]) -> PortfolioConfig:
+        """Update or create portfolio configuration for a section"""
+        try:
+            config = PortfolioConfig(section=section, data=data)
+            await self.conn.execute(
+                "INSERT INTO portfolio_config (section, id, data, last_updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(section) DO UPDATE SET id = excluded.id, data = excluded.data, "
+                "last_updated = excluded.last_updated",
+                (config.section, config.id, json.dumps(config.data), _to_text(config.last_updated))
+            )
+            await self.conn.commit()
+
+            logger.info(f"Portfolio section {section} updated")
+            return config
+
+        except Exception as e:
+            logger.error(f"Error updating portfolio section {section}: {e}")
+            raise
+
+    @timed("find")
+    async def get_portfolio_sections(self) -> List[PortfolioConfig]:
+        """Get every stored portfolio section"""
+        try:
+            async with self.conn.execute("SELECT id, section, data, last_updated FROM portfolio_config") as cursor:
+                rows = await cursor.fetchall()
+            return portfolio_configs(
+                {"id": config_id, "section": section, "data": json.loads(data), "last_updated": _from_text(last_updated)}
+                for config_id, section, data, last_updated in rows
+            )
+
+        except Exception as e:
+            logger.error(f"Error retrieving portfolio sections: {e}")
+            raise
+
+    @timed("find")
+    async def get_portfolio_revision(self) -> Tuple[int, Optional[datetime]]:
+        """Section count and newest last_updated, without reading section data"""
+        try:
+            async with self.conn.execute("SELECT COUNT(*), MAX(last_updated) FROM portfolio_config") as cursor:
+                count, latest = await cursor.fetchone()
+            return count, _from_text(latest) if latest else None
+
+        except Exception as e:
+            logger.error(f"Error retrieving portfolio revision: {e}")
+            raise
@@ -0,0 +1,58 @@
+import asyncio
+import os
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReconciler:
+    """Periodically recounts the inbox counters to correct drift
+
+    The counters are updated alongside each write, but a crash or a failed
+    counter update between the two leaves them off; a recount from the messages
+    themselves puts them right.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def reconcile(self, db) -> bool:
+        """Recount, returning True if the maintained counters had drifted"""
+        before = await db.get_contact_stats()
+        after = await db.reconcile_contact_stats()
+        if before == after:
+            return False
+        logger.warning(
+            f"Contact stats drifted: total {before.total} -> {after.total}, "
+            f"by status {before.by_status} -> {after.by_status}"
+        )
+        return True
+
+    async def _run(self, db, interval: float):
+        # Start with a recount, which also seeds counters for messages stored before they existed
+        while True:
+            try:
+                await self.reconcile(db)
+            except Exception as e:
+                logger.error(f"Error reconciling contact stats: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, db):
+        """Reconcile every CONTACT_STATS_RECONCILE_INTERVAL seconds (0 disables)"""
+        interval = float(os.environ.get("CONTACT_STATS_RECONCILE_INTERVAL", "3600"))
+        if interval > 0:
+            self._task = asyncio.create_task(self._run(db, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global inbox stats reconciler
+stats_reconciler = StatsReconciler()
@@ -0,0 +1,170 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+from collections import Counter
+from datetime import datetime
+from pydantic import ValidationError
+from models import ContactMessage, ContactMessageCreate, ContactStats, MessageStatus, PortfolioConfig
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Inbox counters are kept under dotted keys: "total", "status.<status>" and "days.<YYYY-MM-DD>"
+STATS_DAY_FORMAT = "%Y-%m-%d"
+
+
+def stats_increments(messages: Iterable[ContactMessage]) -> Dict[str, int]:
+    """Counter increments for newly stored messages"""
+    increments: Counter = Counter()
+    for message in messages:
+        increments["total"] += 1
+        increments[f"status.{MessageStatus(message.status).value}"] += 1
+        increments[f"days.{message.created_at.strftime(STATS_DAY_FORMAT)}"] += 1
+    return dict(increments)
+
+
+def status_change_increments(changes: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+    """Counter increments for (old status, new status) changes"""
+    increments: Counter = Counter()
+    for old, new in changes:
+        increments[f"status.{MessageStatus(old).value}"] -= 1
+        increments[f"status.{MessageStatus(new).value}"] += 1
+    return {key: value for key, value in increments.items() if value}
+
+
+def stats_from_counters(counters: Dict[str, int]) -> ContactStats:
+    """Build ContactStats from dotted-key counters"""
+    by_status = {member.value: 0 for member in MessageStatus}
+    by_day = {}
+    for key, count in counters.items():
+        group, _, name = key.partition(".")
+        if group == "status":
+            by_status[name] = count
+        elif group == "days" and count:
+            by_day[name] = count
+    return ContactStats(total=counters.get("total", 0), by_status=by_status, by_day=dict(sorted(by_day.items())))
+
+def portfolio_configs(documents: Iterable[dict]) -> List[PortfolioConfig]:
+    """Build PortfolioConfig from stored documents, logging and skipping any that fail validation"""
+    configs = []
+    for document in documents:
+        try:
+            configs.append(PortfolioConfig(**document))
+        except ValidationError as e:
+            logger.error(f"Skipping invalid portfolio section {document.get('section')!r}: {e}")
+    return configs
+
+class BaseDatabase(ABC):
+    """Storage interface the API is written against
+
+    Every backend must behave the same for these operations; backend_test.py
+    --conformance runs one suite against all of them.
+    """
+
+    @abstractmethod
+    async def connect(self):
+        """Open the backend and prepare it for serving"""
+
+    @abstractmethod
+    async def disconnect(self):
+        """Release the backend's connections"""
+
+    # Contact Message Operations
+    @abstractmethod
+    async def create_contact_message(
+        self,
+        message_data: ContactMessageCreate,
+        duplicate_of: Optional[str] = None
+    ) -> ContactMessage:
+        """Create a new contact message"""
+
+    @abstractmethod
+    async def create_contact_messages(self, messages: List[ContactMessage]) -> int:
+        """Insert a batch of already-built contact messages, returning how many were written"""
+
+    @abstractmethod
+    async def get_contact_messages(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[ContactMessage]:
+        """Retrieve contact messages newest first, by skip/limit or strictly before/after a (created_at, id) key"""
+
+    @abstractmethod
+    async def get_contact_message_summaries(
+        self,
+        limit: int = 50,
+        skip: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[tuple]:
+        """Retrieve CONTACT_SUMMARY_FIELDS rows, paginated like get_contact_messages"""
+
+    @abstractmethod
+    async def get_contact_message_by_id(self, message_id: str) -> Optional[ContactMessage]:
+        """Get a specific contact message by ID"""
+
+    @abstractmethod
+    async def get_contact_messages_by_ids(self, message_ids: List[str]) -> List[ContactMessage]:
+        """Get the stored messages among `message_ids`, in no particular order"""
+
+    @abstractmethod
+    def iter_contact_messages(
+        self,
+        batch_size: int = 500,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> AsyncIterator[ContactMessage]:
+        """Yield the messages matching the filters oldest first, reading `batch_size` at a time"""
+
+    @abstractmethod
+    async def update_message_status(self, message_id: str, status: str) -> bool:
+        """Set a message's status, returning False if the message is missing or already had it"""
+
+    @abstractmethod
+    async def update_message_statuses(self, updates: Dict[str, str]) -> Dict[str, str]:
+        """Apply {message_id: status} in one batch, returning {message_id: "updated" | "unchanged" | "not_found"}"""
+
+    @abstractmethod
+    async def get_contact_message_ids(
+        self,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[str]:
+        """IDs of the messages matching the given status and created_at range"""
+
+    @abstractmethod
+    async def archive_contact_messages(self, status: str, created_before: datetime, limit: int) -> List[str]:
+        """Move up to `limit` of the oldest messages in `status` created before `created_before` to the archive
+
+        Archived messages leave listings, exports and status updates but are
+        still found by ID. Returns the IDs that were moved.
+        """
+
+    @abstractmethod
+    async def get_contact_stats(self) -> ContactStats:
+        """Inbox counters, maintained as messages are created and change status"""
+
+    @abstractmethod
+    async def reconcile_contact_stats(self) -> ContactStats:
+        """Recount the inbox, archive included, and replace the maintained counters"""
+
+    # Portfolio Configuration Operations
+    @abstractmethod
+    async def get_portfolio_section(self, section: str) -> Optional[PortfolioConfig]:
+        """Get portfolio configuration for a specific section"""
+
+    @abstractmethod
+    async def update_portfolio_section(self, section: str, data: Union[dict, list]) -> PortfolioConfig:
+        """Update or create portfolio configuration for a section"""
+
+    @abstractmethod
+    async def get_portfolio_sections(self) -> List[PortfolioConfig]:
+        """Get every stored portfolio section, skipping documents that fail validation"""
+
+    @abstractmethod
+    async def get_portfolio_revision(self) -> Tuple[int, Optional[datetime]]:
+        """Cheap change marker for portfolio_config: (section count, newest last_updated)"""
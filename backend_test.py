@@ -4,24 +4,31 @@ Backend Testing Suite for Chindhamani's Portfolio Website
 Tests all backend APIs, database operations, and validation logic
 """
 
+import argparse
 import asyncio
 import aiohttp
 import json
 import os
+import random
 import sys
-from datetime import datetime
+import tempfile
+import time
+from datetime import datetime, timedelta
 from typing import Dict, Any, List
 import uuid
 
 # Add backend directory to path for imports
 sys.path.append('/app/backend')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
 
 class PortfolioBackendTester:
-    def __init__(self):
+    def __init__(self, base_url: str = None):
         # Get backend URL from frontend .env file
-        self.base_url = self._get_backend_url()
+        self.base_url = base_url or self._get_backend_url()
         self.session = None
         self.test_results = []
+        # Matches aiohttp's default; the benchmark raises it to its concurrency
+        self.connection_limit = 100
         
     def _get_backend_url(self) -> str:
         """Get backend URL from frontend .env file"""
@@ -38,7 +45,9 @@ class PortfolioBackendTester:
     
     async def setup(self):
         """Initialize test session"""
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connection_limit)
+        )
         print(f"🚀 Starting backend tests for: {self.base_url}")
         print("=" * 60)
     
@@ -81,6 +90,19 @@ class PortfolioBackendTester:
         except Exception as e:
             self.log_test("API Health Check", "FAIL", f"Connection error: {str(e)}")
     
+    async def test_health_probes(self):
+        """Test the liveness and readiness probes"""
+        for probe in ["livez", "readyz"]:
+            try:
+                async with self.session.get(f"{self.base_url}/api/{probe}") as response:
+                    data = await response.json()
+                    if response.status == 200:
+                        self.log_test(f"Health Probe - {probe}", "PASS", str(data))
+                    else:
+                        self.log_test(f"Health Probe - {probe}", "FAIL", f"HTTP {response.status}", data)
+            except Exception as e:
+                self.log_test(f"Health Probe - {probe}", "FAIL", f"Request error: {str(e)}")
+    
     async def test_portfolio_data_api(self):
         """Test portfolio data endpoints"""
         # Test complete portfolio data
@@ -136,6 +158,72 @@ class PortfolioBackendTester:
             except Exception as e:
                 self.log_test(f"Portfolio Section API - {section}", "FAIL", f"Request error: {str(e)}")
     
+    async def test_portfolio_caching(self):
+        """Test ETag revalidation on portfolio endpoints"""
+        for path in ["/api/portfolio", "/api/portfolio/skills"]:
+            try:
+                async with self.session.get(f"{self.base_url}{path}") as response:
+                    etag = response.headers.get("ETag")
+                    if response.status != 200 or not etag:
+                        self.log_test(f"Portfolio Caching - {path}", "FAIL", 
+                                    f"Expected 200 with ETag, got {response.status}")
+                        continue
+                
+                async with self.session.get(
+                    f"{self.base_url}{path}",
+                    headers={"If-None-Match": etag}
+                ) as response:
+                    if response.status == 304:
+                        self.log_test(f"Portfolio Caching - {path}", "PASS", 
+                                    f"Revalidated with ETag {etag}")
+                    else:
+                        self.log_test(f"Portfolio Caching - {path}", "FAIL", 
+                                    f"Expected 304, got {response.status}")
+            except Exception as e:
+                self.log_test(f"Portfolio Caching - {path}", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_portfolio_fields(self):
+        """Test ?fields= sparse selection on the portfolio endpoint"""
+        try:
+            async with self.session.get(
+                f"{self.base_url}/api/portfolio", params={"fields": "personal.name,skills.languages"}
+            ) as response:
+                data = (await response.json()).get("data", {})
+                if response.status == 200 and set(data) == {"personal", "skills"} and list(data["personal"]) == ["name"]:
+                    self.log_test("Portfolio Fields - Selection", "PASS", "Only the requested paths returned")
+                else:
+                    self.log_test("Portfolio Fields - Selection", "FAIL", f"HTTP {response.status}", data)
+            
+            async with self.session.get(
+                f"{self.base_url}/api/portfolio", params={"fields": "personal.unknown"}
+            ) as response:
+                if response.status == 400:
+                    self.log_test("Portfolio Fields - Unknown Path", "PASS", "Correctly rejected unknown path")
+                else:
+                    self.log_test("Portfolio Fields - Unknown Path", "FAIL", f"Expected 400, got {response.status}")
+        except Exception as e:
+            self.log_test("Portfolio Fields", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_response_compression(self):
+        """Test Accept-Encoding negotiation on portfolio payloads"""
+        for encoding in ["gzip", "identity"]:
+            try:
+                # aiohttp decodes the body itself, so only the headers are checked here
+                async with self.session.get(
+                    f"{self.base_url}/api/portfolio",
+                    headers={"Accept-Encoding": encoding}
+                ) as response:
+                    content_encoding = response.headers.get("Content-Encoding")
+                    expected = None if encoding == "identity" else encoding
+                    if response.status == 200 and content_encoding == expected and "Accept-Encoding" in response.headers.get("Vary", ""):
+                        self.log_test(f"Response Compression - {encoding}", "PASS", 
+                                    f"Content-Encoding: {content_encoding}")
+                    else:
+                        self.log_test(f"Response Compression - {encoding}", "FAIL", 
+                                    f"Got {response.status} with Content-Encoding {content_encoding}")
+            except Exception as e:
+                self.log_test(f"Response Compression - {encoding}", "FAIL", f"Request error: {str(e)}")
+    
     async def test_contact_form_api(self):
         """Test contact form API with various scenarios"""
         
@@ -284,6 +372,54 @@ class PortfolioBackendTester:
         except Exception as e:
             self.log_test("Contact Messages - Get All", "FAIL", f"Request error: {str(e)}")
         
+        # Test cursor pagination: following X-Next-Cursor must not repeat messages
+        try:
+            async with self.session.get(
+                f"{self.base_url}/api/contact/messages", params={"limit": 1}
+            ) as response:
+                first_page = await response.json()
+                next_cursor = response.headers.get("X-Next-Cursor")
+            
+            if response.status != 200:
+                self.log_test("Contact Messages - Cursor Pagination", "FAIL", 
+                            f"HTTP {response.status}", first_page)
+            elif not next_cursor:
+                self.log_test("Contact Messages - Cursor Pagination", "SKIP", 
+                            "Not enough messages to page through")
+            else:
+                async with self.session.get(
+                    f"{self.base_url}/api/contact/messages",
+                    params={"limit": 1, "before": next_cursor}
+                ) as response:
+                    second_page = await response.json()
+                    # An empty page is fine: the cursor only says the first page was full
+                    if response.status == 200 and (not second_page or second_page[0]["id"] != first_page[0]["id"]):
+                        self.log_test("Contact Messages - Cursor Pagination", "PASS", 
+                                    "Next page continues after the cursor")
+                    else:
+                        self.log_test("Contact Messages - Cursor Pagination", "FAIL", 
+                                    f"HTTP {response.status}", second_page)
+        except Exception as e:
+            self.log_test("Contact Messages - Cursor Pagination", "FAIL", f"Request error: {str(e)}")
+        
+        # A crafted cursor with a UTC offset is compared as the same instant in UTC
+        try:
+            import base64
+            raw = json.dumps(["2999-01-01T02:00:00+02:00", "offset-cursor"]).encode()
+            cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+            async with self.session.get(f"{self.base_url}/api/contact/messages") as response:
+                newest = [message["id"] for message in await response.json()][:5]
+            async with self.session.get(
+                f"{self.base_url}/api/contact/messages", params={"limit": 5, "before": cursor}
+            ) as response:
+                data = await response.json()
+                if response.status == 200 and [message["id"] for message in data] == newest:
+                    self.log_test("Contact Messages - Cursor With Offset", "PASS", "Offset cursor was normalized to UTC")
+                else:
+                    self.log_test("Contact Messages - Cursor With Offset", "FAIL", f"HTTP {response.status}", data)
+        except Exception as e:
+            self.log_test("Contact Messages - Cursor With Offset", "FAIL", f"Request error: {str(e)}")
+        
         # Test getting specific message (if we have a test contact ID)
         if hasattr(self, 'test_contact_id'):
             try:
@@ -363,6 +499,336 @@ class PortfolioBackendTester:
         except Exception as e:
             self.log_test("Message Status Update - Invalid", "FAIL", f"Request error: {str(e)}")
     
+    async def test_message_stream(self):
+        """Test that the SSE feed delivers a newly submitted message"""
+        try:
+            async with self.session.get(f"{self.base_url}/api/contact/messages/stream") as stream:
+                if stream.status != 200 or not stream.headers.get("Content-Type", "").startswith("text/event-stream"):
+                    self.log_test("Message Stream", "FAIL", f"HTTP {stream.status}")
+                    return
+                
+                async with self.session.post(f"{self.base_url}/api/contact", json={
+                    "name": "Stream Test User",
+                    "email": "stream@example.com",
+                    "subject": "Message stream test",
+                    "message": "This message should show up on the event stream."
+                }) as response:
+                    contact_id = (await response.json()).get("contact_id")
+                
+                async def wait_for_event():
+                    async for line in stream.content:
+                        if line.startswith(b"data: ") and contact_id and contact_id.encode() in line:
+                            return True
+                
+                if await asyncio.wait_for(wait_for_event(), timeout=5):
+                    self.log_test("Message Stream", "PASS", f"message.created received for {contact_id}")
+                else:
+                    self.log_test("Message Stream", "FAIL", "Stream ended before the event arrived")
+        except asyncio.TimeoutError:
+            self.log_test("Message Stream", "FAIL", "No event within 5s")
+        except Exception as e:
+            self.log_test("Message Stream", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_message_etag(self):
+        """Test conditional single-message lookups and ETag changes on status updates"""
+        if not self.test_contact_id:
+            self.log_test("Message ETag", "SKIP", "No test contact ID available")
+            return
+        
+        url = f"{self.base_url}/api/contact/messages/{self.test_contact_id}"
+        try:
+            async with self.session.get(url) as response:
+                etag = response.headers.get("ETag")
+            if not etag:
+                self.log_test("Message ETag", "FAIL", "No ETag header on message lookup")
+                return
+            
+            async with self.session.get(url, headers={"If-None-Match": etag}) as response:
+                if response.status != 304:
+                    self.log_test("Message ETag", "FAIL", f"Expected 304, got {response.status}")
+                    return
+            
+            async with self.session.patch(f"{url}/status", params={"status": "unread"}) as response:
+                pass
+            async with self.session.get(url, headers={"If-None-Match": etag}) as response:
+                data = await response.json()
+                if response.status == 200 and data.get("status") == "unread" and response.headers.get("ETag") != etag:
+                    self.log_test("Message ETag", "PASS", "304 while unchanged, fresh body after a status update")
+                else:
+                    self.log_test("Message ETag", "FAIL", f"HTTP {response.status} after status update", data)
+        except Exception as e:
+            self.log_test("Message ETag", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_contact_import(self):
+        """Test the NDJSON bulk import with a mix of valid and invalid lines"""
+        record = {
+            "name": "Import Test User",
+            "email": "import@example.com",
+            "subject": "Imported message",
+            "message": "This message was loaded through the bulk import.",
+            "created_at": "2023-06-01T12:00:00Z",
+            "status": "replied"
+        }
+        body = "\n".join([
+            json.dumps(record),
+            "{not json",
+            json.dumps(dict(record, email="not-an-email")),
+            json.dumps(dict(record, status="unread")),
+        ])
+        try:
+            async with self.session.post(f"{self.base_url}/api/contact/import", data=body.encode(),
+                                         headers={"Content-Type": "application/x-ndjson"}) as response:
+                data = await response.json()
+                failed_lines = [error["line"] for error in data.get("errors", [])]
+                if response.status == 200 and data.get("imported") == 2 and failed_lines == [2, 3]:
+                    self.log_test("Contact Import", "PASS", f"Imported {data['imported']}, rejected lines {failed_lines}")
+                else:
+                    self.log_test("Contact Import", "FAIL", f"HTTP {response.status}", data)
+        except Exception as e:
+            self.log_test("Contact Import", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_contact_summary_view(self):
+        """Test the summary listing: column names once, rows without bodies, and the same cursors as the full view"""
+        try:
+            async with self.session.get(f"{self.base_url}/api/contact/messages", params={"limit": 2}) as response:
+                full = await response.json()
+            async with self.session.get(
+                f"{self.base_url}/api/contact/messages", params={"limit": 1, "view": "summary"}
+            ) as response:
+                first_page = await response.json()
+                next_cursor = response.headers.get("X-Next-Cursor")
+            fields = ["id", "name", "subject", "status", "created_at"]
+            if response.status != 200 or first_page.get("fields") != fields:
+                self.log_test("Contact Messages - Summary View", "FAIL", f"HTTP {response.status}", first_page)
+            elif len(full) < 2:
+                self.log_test("Contact Messages - Summary View", "SKIP", "Not enough messages to page through")
+            else:
+                async with self.session.get(
+                    f"{self.base_url}/api/contact/messages",
+                    params={"limit": 1, "view": "summary", "before": next_cursor}
+                ) as response:
+                    second_page = await response.json()
+                rows = first_page["rows"] + second_page.get("rows", [])
+                expected = [[message[field] for field in fields] for message in full]
+                if response.status == 200 and next_cursor and rows == expected:
+                    self.log_test("Contact Messages - Summary View", "PASS", "Summary rows match the full view across pages")
+                else:
+                    self.log_test("Contact Messages - Summary View", "FAIL", f"HTTP {response.status}",
+                                  {"rows": rows, "expected": expected})
+        except Exception as e:
+            self.log_test("Contact Messages - Summary View", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_contact_search(self):
+        """Test search ranking, non-ASCII terms, and that new submissions are searchable at once"""
+        token = f"srch{uuid.uuid4().hex[:10]}"
+        record = {
+            "name": "Search Test User",
+            "email": "search@example.com",
+            "subject": "Search ranking test",
+            "message": "A message body used by the search ranking test.",
+        }
+        body = "\n".join(json.dumps(dict(record, **fields)) for fields in [
+            {"message": f"The body mentions {token} once, the subject does not."},
+            {"subject": f"Subject about {token}"},
+            {"message": f"Grüße und привет from {token}."},
+        ])
+        url = f"{self.base_url}/api/contact/messages/search"
+        try:
+            async with self.session.post(f"{self.base_url}/api/contact/import", data=body.encode(),
+                                         headers={"Content-Type": "application/x-ndjson"}) as response:
+                await response.read()
+            
+            async with self.session.get(url, params={"q": token}) as response:
+                data = await response.json()
+                subjects = [hit["message"]["subject"] for hit in data.get("results", [])]
+                if response.status == 200 and data.get("total") == 3 and subjects[0] == f"Subject about {token}":
+                    self.log_test("Contact Search - Ranking", "PASS", "Subject match ranked above body matches")
+                else:
+                    self.log_test("Contact Search - Ranking", "FAIL", f"HTTP {response.status}", data)
+            
+            async with self.session.get(url, params={"q": f"grüße привет {token}"}) as response:
+                data = await response.json()
+                if response.status == 200 and data.get("total") == 1:
+                    self.log_test("Contact Search - Non-ASCII", "PASS", "Accented and Cyrillic terms matched")
+                else:
+                    self.log_test("Contact Search - Non-ASCII", "FAIL", f"HTTP {response.status}", data)
+            
+            async with self.session.post(f"{self.base_url}/api/contact", json=dict(
+                record, subject=f"Fresh submission {token}"
+            )) as response:
+                contact_id = (await response.json()).get("contact_id")
+            async with self.session.get(url, params={"q": f"fresh {token}"}) as response:
+                data = await response.json()
+                ids = [hit["message"]["id"] for hit in data.get("results", [])]
+                if response.status == 200 and contact_id and ids == [contact_id]:
+                    self.log_test("Contact Search - New Message", "PASS", "Submission searchable immediately")
+                else:
+                    self.log_test("Contact Search - New Message", "FAIL", f"HTTP {response.status}", data)
+        except Exception as e:
+            self.log_test("Contact Search", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_bulk_status_filter_timezones(self):
+        """Test that bulk status filters compare offset timestamps in UTC"""
+        # A window of its own, so earlier runs against the same store do not match
+        base = datetime(1990, 1, 1) + timedelta(hours=2 * random.randrange(100_000))
+        body = "\n".join(
+            json.dumps({
+                "name": "Timezone Test User",
+                "email": "timezone@example.com",
+                "subject": "Timezone filter test",
+                "message": "This message checks bulk status filters with offsets.",
+                "created_at": (base + timedelta(minutes=minutes)).isoformat() + "Z"
+            })
+            for minutes in (30, 90)
+        )
+        # 02:00+02:00 is base itself, so only the first message falls in [since, until)
+        since = (base + timedelta(hours=2)).isoformat() + "+02:00"
+        until = (base + timedelta(hours=1)).isoformat() + "Z"
+        try:
+            async with self.session.post(f"{self.base_url}/api/contact/import", data=body.encode(),
+                                         headers={"Content-Type": "application/x-ndjson"}) as response:
+                await response.read()
+            async with self.session.patch(f"{self.base_url}/api/contact/messages/status", json={
+                "filter": {"since": since, "until": until},
+                "status": "read"
+            }) as response:
+                data = await response.json()
+                if response.status == 200 and data.get("updated") == 1:
+                    self.log_test("Bulk Status - Timezone Filter", "PASS", f"since={since} until={until}")
+                else:
+                    self.log_test("Bulk Status - Timezone Filter", "FAIL", f"HTTP {response.status}", data)
+        except Exception as e:
+            self.log_test("Bulk Status - Timezone Filter", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_contact_export(self):
+        """Test NDJSON and CSV exports: headers, CSV quoting, and status and time filters"""
+        import csv
+        import io
+        
+        base = datetime(1990, 1, 1) + timedelta(hours=2 * random.randrange(100_000))
+        records = [
+            {
+                "name": "Export Test User",
+                "email": "export@example.com",
+                "subject": f"Export test {minutes}",
+                "message": 'Has a comma, a "quote"\nand a second line.',
+                "created_at": (base + timedelta(minutes=minutes)).isoformat() + "Z",
+                "status": status
+            }
+            for minutes, status in ((10, "replied"), (20, "replied"), (30, "unread"), (90, "replied"))
+        ]
+        body = "\n".join(json.dumps(record) for record in records)
+        # Only the replied messages at +10 and +20 minutes fall in [since, until)
+        params = {
+            "status": "replied",
+            "since": (base + timedelta(hours=2)).isoformat() + "+02:00",
+            "until": (base + timedelta(hours=1)).isoformat() + "Z"
+        }
+        expected = [record["subject"] for record in records[:2]]
+        try:
+            async with self.session.post(f"{self.base_url}/api/contact/import", data=body.encode(),
+                                         headers={"Content-Type": "application/x-ndjson"}) as response:
+                await response.read()
+            
+            async with self.session.get(f"{self.base_url}/api/contact/messages/export",
+                                        params=dict(params, format="ndjson")) as response:
+                content_type = response.headers.get("Content-Type", "")
+                disposition = response.headers.get("Content-Disposition", "")
+                lines = (await response.text()).splitlines()
+            exported = [json.loads(line) for line in lines]
+            if (response.status != 200 or not content_type.startswith("application/x-ndjson")
+                    or not disposition.startswith("attachment") or ".ndjson" not in disposition
+                    or [record["subject"] for record in exported] != expected):
+                self.log_test("Contact Export - NDJSON", "FAIL", f"HTTP {response.status} {content_type}", lines)
+            else:
+                self.log_test("Contact Export - NDJSON", "PASS", f"{len(exported)} filtered messages, oldest first")
+            
+            async with self.session.get(f"{self.base_url}/api/contact/messages/export",
+                                        params=dict(params, format="csv")) as response:
+                content_type = response.headers.get("Content-Type", "")
+                rows = list(csv.DictReader(io.StringIO(await response.text())))
+            if (response.status == 200 and content_type.startswith("text/csv")
+                    and [row["subject"] for row in rows] == expected
+                    and all(row["message"] == records[0]["message"] for row in rows)
+                    and rows[0]["created_at"] == (base + timedelta(minutes=10)).isoformat()):
+                self.log_test("Contact Export - CSV", "PASS", "Quoted fields round-trip through a CSV reader")
+            else:
+                self.log_test("Contact Export - CSV", "FAIL", f"HTTP {response.status} {content_type}", rows)
+        except Exception as e:
+            self.log_test("Contact Export", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_contact_stats(self):
+        """Test the inbox statistics endpoint"""
+        try:
+            async with self.session.get(f"{self.base_url}/api/contact/stats") as response:
+                data = await response.json()
+                if response.status == 200 and data.get("total") == sum(data.get("by_status", {}).values()):
+                    self.log_test("Contact Stats", "PASS", f"{data['total']} messages: {data['by_status']}")
+                else:
+                    self.log_test("Contact Stats", "FAIL", f"HTTP {response.status}", data)
+        except Exception as e:
+            self.log_test("Contact Stats", "FAIL", f"Request error: {str(e)}")
+        
+        # The import test stored messages dated 2023, which a short window must leave out
+        first_day = (datetime.utcnow().date() - timedelta(days=1)).isoformat()
+        try:
+            async with self.session.get(f"{self.base_url}/api/contact/stats", params={"days": 2}) as response:
+                data = await response.json()
+                if response.status == 200 and all(day >= first_day for day in data.get("by_day", {})):
+                    self.log_test("Contact Stats - Day Window", "PASS", f"by_day: {data['by_day']}")
+                else:
+                    self.log_test("Contact Stats - Day Window", "FAIL", f"HTTP {response.status}", data)
+            for days in (-1, 1000000):
+                async with self.session.get(f"{self.base_url}/api/contact/stats", params={"days": days}) as response:
+                    if response.status == 422:
+                        self.log_test("Contact Stats - Days Out Of Range", "PASS", f"Correctly rejected days={days}")
+                    else:
+                        self.log_test("Contact Stats - Days Out Of Range", "FAIL", f"days={days}: expected 422, got {response.status}")
+        except Exception as e:
+            self.log_test("Contact Stats - Day Window", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_profiling(self):
+        """Test the request profiler, when the server was started with PROFILING_TOKEN"""
+        token = os.environ.get("PROFILING_TOKEN")
+        url = f"{self.base_url}/api/debug/profiles"
+        try:
+            if not token:
+                async with self.session.get(url) as response:
+                    if response.status == 404:
+                        self.log_test("Request Profiling", "PASS", "Disabled without PROFILING_TOKEN")
+                    else:
+                        self.log_test("Request Profiling", "FAIL", f"Expected 404 while disabled, got {response.status}")
+                return
+            
+            async with self.session.get(f"{self.base_url}/api/portfolio", headers={"X-Profile": token}) as response:
+                await response.read()
+            async with self.session.get(url) as response:
+                if response.status != 401:
+                    self.log_test("Request Profiling", "FAIL", f"Expected 401 without a token, got {response.status}")
+                    return
+            async with self.session.get(url, headers={"X-Profile-Token": token}) as response:
+                profiles = await response.json()
+            async with self.session.get(url, params={"format": "collapsed"}, headers={"X-Profile-Token": token}) as response:
+                collapsed = await response.text()
+            if any(profile["route"] == "/api/portfolio" for profile in profiles) and response.status == 200:
+                self.log_test("Request Profiling", "PASS", f"{len(profiles)} profiles, {len(collapsed.splitlines())} stacks")
+            else:
+                self.log_test("Request Profiling", "FAIL", "Profiled request missing from the buffer", profiles)
+        except Exception as e:
+            self.log_test("Request Profiling", "FAIL", f"Request error: {str(e)}")
+    
+    async def test_metrics_endpoint(self):
+        """Test the Prometheus metrics endpoint"""
+        try:
+            async with self.session.get(f"{self.base_url}/api/metrics") as response:
+                text = await response.text()
+                if response.status == 200 and "http_request_duration_seconds_bucket" in text:
+                    self.log_test("Metrics Endpoint", "PASS", "Request latency histograms exported")
+                else:
+                    self.log_test("Metrics Endpoint", "FAIL", f"HTTP {response.status}", text[:500])
+        except Exception as e:
+            self.log_test("Metrics Endpoint", "FAIL", f"Request error: {str(e)}")
+    
     async def test_cors_headers(self):
         """Test CORS headers are properly set"""
         try:
@@ -426,14 +892,28 @@ class PortfolioBackendTester:
         try:
             # Core API tests
             await self.test_api_health()
+            await self.test_health_probes()
             await self.test_portfolio_data_api()
+            await self.test_portfolio_caching()
+            await self.test_portfolio_fields()
+            await self.test_response_compression()
             
             # Contact form tests
             await self.test_contact_form_api()
             await self.test_contact_message_retrieval()
             await self.test_message_status_update()
+            await self.test_message_etag()
+            await self.test_contact_import()
+            await self.test_contact_summary_view()
+            await self.test_contact_search()
+            await self.test_bulk_status_filter_timezones()
+            await self.test_contact_export()
+            await self.test_contact_stats()
+            await self.test_message_stream()
             
             # Additional tests
+            await self.test_metrics_endpoint()
+            await self.test_profiling()
             await self.test_cors_headers()
             
         finally:
@@ -442,13 +922,1192 @@ class PortfolioBackendTester:
         self.print_summary()
         return self.test_results
 
+class StorageConformanceTester(PortfolioBackendTester):
+    """Runs one storage suite against every Database backend
+
+    The memory and SQLite backends always run; MongoDB runs when MONGO_URL is
+    set, against a scratch database that is dropped afterwards.
+    """
+    
+    def __init__(self):
+        self.test_results = []
+    
+    async def _backends(self):
+        """Yield (name, connected database) for each backend under test"""
+        from memory_database import MemoryDatabase
+        from sqlite_database import SQLiteDatabase
+        
+        yield "memory", MemoryDatabase()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            yield "sqlite", SQLiteDatabase(os.path.join(tmp, "conformance.sqlite3"))
+        
+        if os.environ.get("MONGO_URL"):
+            from database import MongoDatabase
+            os.environ["DB_NAME"] = os.environ.get("CONFORMANCE_DB_NAME", "portfolio_conformance")
+            yield "mongo", MongoDatabase()
+    
+    @staticmethod
+    def _messages(count: int) -> List[Any]:
+        from models import ContactMessage
+        # Whole seconds apart so every backend keeps the same ordering precision
+        base = datetime(2024, 1, 1)
+        return [
+            ContactMessage(
+                name=f"Conformance User {i}",
+                email=f"user{i}@example.com",
+                subject=f"Conformance subject {i}",
+                message=f"Conformance message body number {i}",
+                created_at=base + timedelta(seconds=i)
+            )
+            for i in range(count)
+        ]
+    
+    async def check_create_and_get(self, db):
+        from models import ContactMessageCreate
+        created = await db.create_contact_message(ContactMessageCreate(
+            name="Conformance User",
+            email="conformance@example.com",
+            subject="Conformance subject",
+            message="Conformance message body"
+        ))
+        fetched = await db.get_contact_message_by_id(created.id)
+        assert fetched is not None and fetched.id == created.id, "created message not found by ID"
+        assert fetched.status == "unread", f"expected unread, got {fetched.status}"
+        assert await db.get_contact_message_by_id(str(uuid.uuid4())) is None, "unknown ID should return None"
+        assert fetched.duplicate_of is None, "new message should not be flagged"
+        flagged = await db.create_contact_message(ContactMessageCreate(
+            name="Conformance User",
+            email="conformance@example.com",
+            subject="Conformance subject",
+            message="Conformance message body"
+        ), duplicate_of=created.id)
+        fetched = await db.get_contact_message_by_id(flagged.id)
+        assert fetched.duplicate_of == created.id, "duplicate_of not stored"
+    
+    async def check_batch_insert(self, db):
+        messages = self._messages(10)
+        assert await db.create_contact_messages(messages) == 10, "batch insert count mismatch"
+        assert await db.create_contact_messages([]) == 0, "empty batch should insert nothing"
+        try:
+            await db.create_contact_messages([messages[0]])
+        except Exception:
+            pass
+        else:
+            raise AssertionError("duplicate ID was accepted")
+    
+    async def check_listing(self, db):
+        listed = await db.get_contact_messages(limit=1000)
+        keys = [(message.created_at, message.id) for message in listed]
+        assert keys == sorted(keys, reverse=True), "listing is not newest first"
+        
+        page = await db.get_contact_messages(limit=3, skip=2)
+        assert [m.id for m in page] == [m.id for m in listed[2:5]], "skip/limit page mismatch"
+    
+    async def check_keyset_pagination(self, db):
+        listed = await db.get_contact_messages(limit=1000)
+        pivot = listed[3]
+        key = (pivot.created_at, pivot.id)
+        
+        older = await db.get_contact_messages(limit=2, before=key)
+        assert [m.id for m in older] == [m.id for m in listed[4:6]], "'before' page mismatch"
+        
+        newer = await db.get_contact_messages(limit=2, after=key)
+        assert [m.id for m in newer] == [m.id for m in listed[1:3]], "'after' page mismatch"
+        
+        summaries = await db.get_contact_message_summaries(limit=2, before=key)
+        assert [row[0] for row in summaries] == [m.id for m in older], "summary page mismatch"
+        assert summaries[0][3] == older[0].status and summaries[0][4] == older[0].created_at, \
+            "summary columns mismatch"
+    
+    async def check_lookup_by_ids(self, db):
+        listed = await db.get_contact_messages(limit=3)
+        wanted = [m.id for m in listed] + [str(uuid.uuid4())]
+        found = await db.get_contact_messages_by_ids(wanted)
+        assert sorted(m.id for m in found) == sorted(m.id for m in listed), "lookup by IDs mismatch"
+        assert await db.get_contact_messages_by_ids([]) == [], "empty ID list should return nothing"
+    
+    async def check_iteration(self, db):
+        listed = await db.get_contact_messages(limit=1000)
+        streamed = [message.id async for message in db.iter_contact_messages(batch_size=3)]
+        assert streamed == [m.id for m in reversed(listed)], "iteration is not oldest first or misses messages"
+        
+        window = [m.id for m in reversed(listed[2:6])]
+        filtered = [
+            message.id async for message in
+            db.iter_contact_messages(batch_size=2, since=listed[5].created_at, until=listed[1].created_at)
+        ]
+        assert filtered == window, "filtered iteration mismatch"
+    
+    async def check_status_update(self, db):
+        listed = await db.get_contact_messages(limit=1)
+        message_id = listed[0].id
+        assert await db.update_message_status(message_id, "read") is True, "status change not reported"
+        assert await db.update_message_status(message_id, "read") is False, "no-op update reported as change"
+        assert (await db.get_contact_message_by_id(message_id)).status == "read", "status not persisted"
+        assert await db.update_message_status(str(uuid.uuid4()), "read") is False, "unknown ID reported as updated"
+    
+    async def check_bulk_status_update(self, db):
+        listed = await db.get_contact_messages(limit=3)
+        missing_id = str(uuid.uuid4())
+        await db.update_message_status(listed[0].id, "replied")
+        results = await db.update_message_statuses({
+            listed[0].id: "replied",
+            listed[1].id: "replied",
+            missing_id: "replied",
+        })
+        assert results == {listed[0].id: "unchanged", listed[1].id: "updated", missing_id: "not_found"}, \
+            f"unexpected bulk results {results}"
+        assert (await db.get_contact_message_by_id(listed[1].id)).status == "replied", "bulk status not persisted"
+    
+    async def check_contact_stats(self, db):
+        stats = await db.get_contact_stats()
+        listed = await db.get_contact_messages(limit=1000)
+        assert stats.total == len(listed), f"stats total {stats.total}, stored {len(listed)}"
+        for status, count in stats.by_status.items():
+            expected = sum(1 for message in listed if message.status == status)
+            assert count == expected, f"{status} count {count}, expected {expected}"
+        assert sum(stats.by_day.values()) == stats.total, "per-day counts do not add up to the total"
+        
+        target = "read" if listed[0].status != "read" else "unread"
+        await db.update_message_status(listed[0].id, target)
+        after = await db.get_contact_stats()
+        assert after.by_status[target] == stats.by_status[target] + 1, "status change not counted"
+        assert await db.reconcile_contact_stats() == after, "reconciled stats differ from maintained ones"
+    
+    async def check_spool_replay(self, db):
+        from pathlib import Path
+        from spool import ContactSpool
+        spool = ContactSpool(db)
+        with tempfile.TemporaryDirectory() as tmp:
+            spool.directory = Path(tmp)
+            # Small batches, so replay has to stream the journal in several reads
+            spool.replay_batch_size = 2
+            messages = self._messages(3)
+            await spool.append(messages)
+            # The first message reached the database before its write was given up on
+            await db.create_contact_messages(messages[:1])
+            assert await spool.replay() == 3, "journal not fully replayed"
+            assert not spool.has_pending(), "journal left behind after replay"
+            stored = await db.get_contact_messages_by_ids([message.id for message in messages])
+            assert len(stored) == 3, f"expected 3 replayed messages, found {len(stored)}"
+    
+    async def check_filtered_ids(self, db):
+        listed = await db.get_contact_messages(limit=1000)
+        oldest, newest = listed[-1], listed[0]
+        ids = await db.get_contact_message_ids(since=oldest.created_at, until=newest.created_at)
+        assert sorted(ids) == sorted(m.id for m in listed[1:]), "created_at range filter mismatch"
+        replied = await db.get_contact_message_ids(status="replied")
+        assert sorted(replied) == sorted(m.id for m in listed if m.status == "replied"), "status filter mismatch"
+    
+    async def check_archive(self, db):
+        cutoff = datetime(2025, 1, 1)
+        listed = await db.get_contact_messages(limit=1000)
+        old = [message for message in listed if message.created_at < cutoff]
+        await db.update_message_statuses({message.id: "replied" for message in old[:3]})
+        eligible = sorted(
+            (message for message in await db.get_contact_messages(limit=1000)
+             if message.status == "replied" and message.created_at < cutoff),
+            key=lambda message: (message.created_at, message.id)
+        )
+        stats = await db.get_contact_stats()
+        
+        first = await db.archive_contact_messages("replied", cutoff, 2)
+        assert first == [message.id for message in eligible[:2]], "archive batch is not the oldest eligible messages"
+        rest = await db.archive_contact_messages("replied", cutoff, 1000)
+        assert sorted(first + rest) == sorted(message.id for message in eligible), "archived set mismatch"
+        assert await db.archive_contact_messages("replied", cutoff, 1000) == [], "nothing should be left to archive"
+        
+        remaining = {message.id for message in await db.get_contact_messages(limit=1000)}
+        assert remaining.isdisjoint(first + rest), "archived messages still listed"
+        assert (await db.get_contact_message_by_id(first[0])).status == "replied", "archived message not found by ID"
+        found = await db.get_contact_messages_by_ids(first + [next(iter(remaining))])
+        assert len(found) == 3, "lookup by IDs does not span the archive"
+        assert await db.update_message_status(first[0], "read") is False, "archived message took a status update"
+        assert await db.get_contact_stats() == stats, "archiving changed the inbox counters"
+        assert await db.reconcile_contact_stats() == stats, "recount does not include the archive"
+    
+    async def check_archive_concurrent_lookup(self, db):
+        messages = self._messages(200)
+        for message in messages:
+            message.status = "replied"
+        await db.create_contact_messages(messages)
+        message_ids = [message.id for message in messages]
+        
+        async def archive_all():
+            archived = []
+            while True:
+                batch = await db.archive_contact_messages("replied", datetime(2025, 1, 1), 20)
+                if not batch:
+                    return archived
+                archived += batch
+        
+        # Lookups racing the archiver must see each message exactly once, live or archived
+        archiving = asyncio.create_task(archive_all())
+        try:
+            while not archiving.done():
+                found = await db.get_contact_messages_by_ids(message_ids)
+                assert sorted(message.id for message in found) == sorted(message_ids), \
+                    f"lookup during archiving returned {len(found)} rows for {len(message_ids)} IDs"
+                # Backends that never suspend would otherwise starve the archiver
+                await asyncio.sleep(0)
+        finally:
+            await asyncio.wait([archiving])
+        assert sorted(archiving.result()) == sorted(message_ids), "archived set mismatch"
+    
+    async def check_portfolio_sections(self, db):
+        assert await db.get_portfolio_section("skills") is None, "unset section should return None"
+        await db.update_portfolio_section("skills", {"languages": ["Python"]})
+        await db.update_portfolio_section("skills", {"languages": ["Python", "SQL"]})
+        config = await db.get_portfolio_section("skills")
+        assert config is not None and config.data == {"languages": ["Python", "SQL"]}, "section upsert mismatch"
+        
+        count, latest = await db.get_portfolio_revision()
+        assert count == 1 and latest == config.last_updated, f"unexpected revision {(count, latest)}"
+        await db.update_portfolio_section("projects", [])
+        sections = {config.section: config.data for config in await db.get_portfolio_sections()}
+        assert sections == {"skills": {"languages": ["Python", "SQL"]}, "projects": []}, "section listing mismatch"
+        assert (await db.get_portfolio_revision())[0] == 2, "revision did not move"
+    
+    async def run_all_tests(self):
+        """Run the conformance suite against each backend"""
+        print("🧩 Storage backend conformance")
+        print("=" * 60)
+        
+        checks = [
+            self.check_create_and_get,
+            self.check_batch_insert,
+            self.check_listing,
+            self.check_keyset_pagination,
+            self.check_lookup_by_ids,
+            self.check_iteration,
+            self.check_status_update,
+            self.check_bulk_status_update,
+            self.check_contact_stats,
+            self.check_spool_replay,
+            self.check_filtered_ids,
+            self.check_archive,
+            self.check_archive_concurrent_lookup,
+            self.check_portfolio_sections,
+        ]
+        
+        async for name, db in self._backends():
+            try:
+                await db.connect()
+            except Exception as e:
+                self.log_test(f"Conformance [{name}] - Connect", "FAIL", str(e))
+                continue
+            try:
+                for check in checks:
+                    label = f"Conformance [{name}] - {check.__name__[len('check_'):]}"
+                    try:
+                        await check(db)
+                        self.log_test(label, "PASS")
+                    except Exception as e:
+                        self.log_test(label, "FAIL", f"{type(e).__name__}: {e}")
+            finally:
+                if name == "mongo":
+                    await db.client.drop_database(os.environ["DB_NAME"])
+                await db.disconnect()
+        
+        self.print_summary()
+        return self.test_results
+
+class ComponentTester(PortfolioBackendTester):
+    """Checks of backend modules whose behavior depends on settings or timing
+
+    Each check builds the module it covers with explicit settings and clocks,
+    in-process or in a LocalServer of its own, so the suite needs no running
+    server and does not depend on how one is configured.
+    """
+    
+    def __init__(self):
+        self.test_results = []
+    
+    @staticmethod
+    def _echo_app():
+        """ASGI app answering 200 with the request body it received"""
+        async def app(scope, receive, send):
+            body = b""
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body", False):
+                    break
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": body})
+        return app
+    
+    @staticmethod
+    async def _asgi_post(app, path: str, body: bytes, client_ip: str = "203.0.113.1",
+                         chunk_size: int = None, content_length: bool = True):
+        """Send one POST through an ASGI app; return (status, headers, body)"""
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] if chunk_size else [body]
+        messages = [
+            {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+            for i, chunk in enumerate(chunks)
+        ]
+        headers = [(b"content-type", b"application/json")]
+        if content_length:
+            headers.append((b"content-length", str(len(body)).encode("ascii")))
+        scope = {"type": "http", "method": "POST", "path": path, "headers": headers, "client": (client_ip, 50000)}
+        sent = []
+        
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+        
+        async def send(message):
+            sent.append(message)
+        
+        await app(scope, receive, send)
+        return sent[0]["status"], dict(sent[0]["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+    
+    @staticmethod
+    def _rate_limiter(ip_burst: float, email_burst: float, per_second: float = 1 / 60):
+        from rate_limit import ContactRateLimitMiddleware, TokenBucketLimiter
+        middleware = ContactRateLimitMiddleware(ComponentTester._echo_app())
+        middleware.enabled = True
+        middleware.by_ip = TokenBucketLimiter(burst=ip_burst, per_second=per_second)
+        middleware.by_email = TokenBucketLimiter(burst=email_burst, per_second=per_second)
+        return middleware
+    
+    async def check_rate_limit_burst_and_refill(self):
+        from rate_limit import TokenBucketLimiter
+        limiter = TokenBucketLimiter(burst=3, per_second=0.5)
+        assert [limiter.acquire("a", now=0) for _ in range(3)] == [0, 0, 0], "burst was not allowed"
+        assert limiter.acquire("a", now=0) == 2.0, "exhausted bucket should wait one refill interval"
+        assert limiter.acquire("b", now=0) == 0, "keys share a bucket"
+        assert limiter.acquire("a", now=1) == 1.0, "half-refilled token should wait the other half"
+        assert limiter.acquire("a", now=2) == 0, "token did not refill"
+        assert [limiter.acquire("a", now=100) for _ in range(4)][:3] == [0, 0, 0], "bucket did not refill to burst"
+    
+    async def check_rate_limit_buckets(self):
+        from metrics import RATE_LIMITED
+        middleware = self._rate_limiter(ip_burst=2, email_burst=1)
+        
+        def payload(email: str) -> bytes:
+            return json.dumps({"email": email, "name": "Limit Test"}).encode()
+        
+        by_email = RATE_LIMITED.values.get(("email",), 0)
+        by_ip = RATE_LIMITED.values.get(("ip",), 0)
+        status, _, _ = await self._asgi_post(middleware, "/api/contact", payload("a@example.com"), "198.51.100.1")
+        assert status == 200, f"first submission got {status}"
+        # Another address from the same IP still has an IP token left
+        status, _, _ = await self._asgi_post(middleware, "/api/contact", payload("b@example.com"), "198.51.100.1")
+        assert status == 200, f"second address from one IP got {status}"
+        status, headers, _ = await self._asgi_post(middleware, "/api/contact", payload("c@example.com"), "198.51.100.1")
+        assert status == 429 and RATE_LIMITED.values.get(("ip",), 0) == by_ip + 1, "IP bucket was not enforced"
+        assert headers.get(b"retry-after") == b"60", f"unexpected Retry-After {headers.get(b'retry-after')}"
+        # The same address from a fresh IP is refused by its email bucket, case and spacing aside
+        status, _, _ = await self._asgi_post(middleware, "/api/contact", payload(" A@Example.com"), "198.51.100.2")
+        assert status == 429 and RATE_LIMITED.values.get(("email",), 0) == by_email + 1, "email bucket was not enforced"
+        status, _, _ = await self._asgi_post(middleware, "/api/contact", payload("d@example.com"), "198.51.100.2")
+        assert status == 200, "email rejection used up the IP bucket of another address"
+        # Other routes are never limited
+        status, _, _ = await self._asgi_post(middleware, "/api/contact/import", payload("a@example.com"), "198.51.100.1")
+        assert status == 200, f"unrelated route was limited with {status}"
+    
+    async def check_rate_limit_body_cap(self):
+        middleware = self._rate_limiter(ip_burst=100, email_burst=100)
+        middleware.max_body_bytes = 1024
+        small = json.dumps({"email": "cap@example.com", "message": "x" * 500}).encode()
+        status, _, body = await self._asgi_post(middleware, "/api/contact", small, chunk_size=128)
+        assert status == 200 and body == small, "body under the cap was not replayed intact"
+        large = json.dumps({"email": "cap@example.com", "message": "x" * 2000}).encode()
+        status, _, _ = await self._asgi_post(middleware, "/api/contact", large)
+        assert status == 413, f"declared oversized body got {status}"
+        status, _, _ = await self._asgi_post(middleware, "/api/contact", large, chunk_size=256, content_length=False)
+        assert status == 413, f"streamed oversized body got {status}"
+    
+    async def check_backend_import_order(self):
+        # The global backend is built when `database` is imported; a backend module imported first must not cycle back
+        backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+        for backend, module in (("memory", "memory_database"), ("sqlite", "sqlite_database")):
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-c", f"import {module}, database",
+                cwd=backend_dir, env=dict(os.environ, DATABASE_BACKEND=backend),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+            )
+            output, _ = await process.communicate()
+            assert process.returncode == 0, f"importing {module} first failed: {output.decode()[-300:]}"
+    
+    async def check_import_line_cap(self):
+        from fastapi import HTTPException
+        from contact_import import ndjson_lines
+        
+        async def read(chunks):
+            async def stream():
+                for chunk in chunks:
+                    yield chunk
+            return [(number, line) async for number, line in ndjson_lines(stream(), max_line_bytes=16)]
+        
+        assert await read([b'{"a": 1}\n\n', b'{"b":', b' 2}\n']) == [(1, b'{"a": 1}'), (3, b'{"b": 2}')]
+        # Oversized lines are refused whether they arrive whole inside one chunk or split across several
+        for chunks, line in (([b"short\n" + b"x" * 40 + b"\nshort\n"], 2), ([b"short\n", b"x" * 10, b"x" * 10], 2)):
+            try:
+                await read(chunks)
+            except HTTPException as e:
+                assert e.status_code == 413 and f"Line {line} " in e.detail, e.detail
+            else:
+                raise AssertionError(f"oversized line in {chunks!r} was accepted")
+    
+    async def check_spool_during_outage(self):
+        from pathlib import Path
+        with tempfile.TemporaryDirectory() as spool_dir:
+            server = LocalServer(env={
+                "DATABASE_BACKEND": "mongo",
+                "MONGO_URL": "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=200",
+                "CONTACT_SPOOL_DIR": spool_dir,
+            }, probe="livez")
+            base_url = server.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(f"{base_url}/api/contact", json={
+                        "name": "Outage Test User",
+                        "email": "outage@example.com",
+                        "subject": "Spool outage test",
+                        "message": "This message is submitted while the database is down."
+                    }) as response:
+                        status, data = response.status, await response.json()
+                    async with session.get(f"{base_url}/api/readyz") as response:
+                        ready = response.status
+            finally:
+                server.stop()
+            journal = Path(spool_dir) / "contacts.ndjson"
+            assert ready == 503, f"server reports ready with the database down ({ready})"
+            assert status == 200, f"submission during the outage got {status}: {data}"
+            assert journal.exists() and data["contact_id"] in journal.read_text(), "submission was not journaled"
+    
+    async def check_warmup_invalid_portfolio_section(self):
+        from models import ContactMessage
+        from sqlite_database import SQLiteDatabase
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "warmup.sqlite3")
+            db = SQLiteDatabase(path)
+            await db.connect()
+            message = ContactMessage(name="Warmup User", email="warmup@example.com",
+                                     subject="Warmup ordering", message="Stored before a server restart.")
+            await db.create_contact_messages([message])
+            # A section PortfolioConfig does not know, as left by an older or newer deployment
+            await db.conn.execute(
+                "INSERT INTO portfolio_config (section, id, data, last_updated) VALUES (?, ?, ?, ?)",
+                ("awards", "awards-id", "[]", "2025-01-01T00:00:00.000000")
+            )
+            await db.conn.commit()
+            await db.disconnect()
+            
+            server = LocalServer(env={"DATABASE_BACKEND": "sqlite", "SQLITE_PATH": path})
+            base_url = server.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"{base_url}/api/portfolio") as response:
+                        portfolio = response.status
+                    async with session.get(f"{base_url}/api/contact/messages/search", params={"q": "warmup ordering"}) as response:
+                        found = [hit["message"]["id"] for hit in (await response.json())["results"]]
+            finally:
+                server.stop()
+        assert portfolio == 200, f"portfolio got {portfolio}"
+        assert found == [message.id], f"search index was not rebuilt, found {found}"
+    
+    async def check_search_caps(self):
+        from models import ContactMessage
+        from search_index import InvertedIndex
+        index = InvertedIndex(max_scanned=6, max_scored=2)
+        messages = [
+            ContactMessage(name="Cap User", email="cap@example.com", subject=f"Capped topic {i}",
+                           message="capped search " + ("extra " if i % 2 else ""))
+            for i in range(10)
+        ]
+        for message in messages:
+            index.add(message)
+        total, exact, hits = index.search("capped", limit=10)
+        assert (total, exact) == (10, True), "single-term count should be exact"
+        assert {message_id for message_id, _ in hits} == {messages[9].id, messages[8].id}, \
+            "cap should keep the most recently indexed matches"
+        total, exact, hits = index.search("capped extra", limit=10)
+        assert (total, exact) == (2, False), f"capped multi-term count should be a lower bound, got {(total, exact)}"
+        assert {message_id for message_id, _ in hits} == {messages[9].id, messages[7].id}, \
+            "multi-term cap did not walk newest first"
+        index.max_scanned, index.max_scored = 100, 100
+        assert index.search("capped extra")[:2] == (5, True), "uncapped multi-term count is wrong"
+    
+    async def check_search_index_archive(self):
+        from archiver import ContactArchiver
+        from memory_database import MemoryDatabase
+        from models import ContactMessage
+        from search_index import search_index
+        db = MemoryDatabase()
+        await db.connect()
+        token = f"arch{uuid.uuid4().hex[:10]}"
+        old = ContactMessage(name="Archive User", email="archive@example.com", subject=f"Old {token}",
+                             message="An old replied message.", status="replied",
+                             created_at=datetime.utcnow() - timedelta(days=400))
+        live = ContactMessage(name="Archive User", email="archive@example.com", subject=f"Live {token}",
+                              message="A recent message that stays live.")
+        await db.create_contact_messages([old, live])
+        for message in (old, live):
+            search_index.add(message)
+        assert search_index.search(token)[0] == 2, "messages were not indexed"
+        
+        archiver = ContactArchiver()
+        assert await archiver.archive(db) == 1, "old replied message was not archived"
+        total, _, hits = search_index.search(token)
+        assert total == 1 and hits[0][0] == live.id, "archived message is still searchable"
+        
+        await search_index.rebuild(db)
+        assert [message_id for message_id, _ in search_index.search(token)[2]] == [live.id], \
+            "rebuild disagrees with incremental removal"
+        await db.disconnect()
+    
+    async def check_portfolio_selection_compression(self):
+        from compression import ENCODINGS, compress
+        from portfolio_cache import PortfolioCache
+        from portfolio_data import PORTFOLIO_DATA
+        cache = PortfolioCache()
+        cache.refresh(PORTFOLIO_DATA)
+        encoding = ENCODINGS[0]
+        assert cache.full.variant(encoding)[0] == compress(cache.full.body, encoding, best=True), \
+            "snapshot payload is not compressed at the highest level"
+        
+        selection = cache.select("experience,projects")
+        assert selection.encoded == {}, "selection was compressed before any client asked for an encoding"
+        body, etag = selection.variant(encoding)
+        assert body == compress(selection.body, encoding), "selection is not compressed at the per-request level"
+        assert list(selection.encoded) == [encoding], "only the requested encoding should be compressed"
+        assert selection.matches(etag) and selection.matches(selection.etag), "selection ETags do not match"
+    
+    async def check_duplicate_lookup(self):
+        from fingerprint import RecentFingerprints, message_fingerprint
+        recent = RecentFingerprints(max_distance=6, window_seconds=60)
+        subject = "Question about the data platform role"
+        text = ("Hello, I read about your work on streaming data pipelines and would like to ask "
+                "whether you are open to a conversation about a senior engineering role on our "
+                "platform team next month. Happy to share more details about the position.")
+        recent.add(message_fingerprint(subject, text), "original", now=0)
+        
+        edited = message_fingerprint(subject, text.replace("next month", "next week"))
+        match = recent.find(edited, now=1)
+        assert match is not None and match[0] == "original", "near-duplicate was not found"
+        assert match[1] <= 6, f"near-duplicate is {match[1]} bits apart"
+        distinct = message_fingerprint("Portfolio feedback", "Loved the project write-ups, especially the "
+                                       "dashboard one. Do you have the source code on GitHub anywhere?")
+        assert recent.find(distinct, now=1) is None, "distinct message matched"
+        assert recent.find(edited, now=120) is None, "fingerprint outlived its window"
+        assert len(recent) == 0 and not recent.buckets, "expired fingerprint left in the band index"
+    
+    async def check_duplicate_non_latin(self):
+        from fingerprint import DuplicateDetector
+        detector = DuplicateDetector()
+        first = ("Вопрос о сотрудничестве", "Здравствуйте, хотел бы обсудить возможный проект по анализу данных в следующем месяце.")
+        second = ("Отзыв о портфолио", "Очень понравились ваши статьи про визуализацию, особенно раздел о картах и графиках.")
+        fingerprint, duplicate_of = detector.check(*first)
+        assert fingerprint is not None and duplicate_of is None, "Cyrillic message was not fingerprinted"
+        detector.recent.add(fingerprint, "first")
+        assert detector.check(*second)[1] is None, "unrelated Cyrillic messages matched"
+        assert detector.check(*first)[1] == "first", "repeated Cyrillic message was not matched"
+        # Unspaced CJK text is one or two terms, too few to compare, so it is never matched
+        assert detector.check("你好", "我想了解一下你的项目经验和合作方式。") == (None, None)
+    
+    async def check_duplicate_drop(self):
+        message = {
+            "name": "Drop Test User",
+            "email": "drop@example.com",
+            "subject": "Duplicate drop test",
+            "message": "This message is sent twice, and the second copy should be dropped quietly."
+        }
+        server = LocalServer(env={"DUPLICATE_ACTION": "drop"})
+        base_url = server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                ids = []
+                for sender in ("first@example.com", "second@example.com"):
+                    async with session.post(f"{base_url}/api/contact", json=dict(message, email=sender)) as response:
+                        data = await response.json()
+                        assert response.status == 200 and data["success"], f"submission got {response.status}"
+                        ids.append(data["contact_id"])
+                async with session.get(f"{base_url}/api/contact/messages") as response:
+                    stored = [stored["id"] for stored in await response.json()]
+        finally:
+            server.stop()
+        assert ids[1] != ids[0], "drop response revealed the original message's ID"
+        assert stored == [ids[0]], f"expected only the original to be stored, found {stored}"
+    
+    class RecordingDatabase:
+        """Stands in for a backend's batch insert, recording each batch's IDs"""
+        
+        def __init__(self, error: Exception = None):
+            self.error = error
+            self.batches: List[List[str]] = []
+            # Cleared to hold writes until the check sets it
+            self.gate = asyncio.Event()
+            self.gate.set()
+        
+        async def create_contact_messages(self, messages) -> int:
+            await self.gate.wait()
+            if self.error is not None:
+                raise self.error
+            self.batches.append([message.id for message in messages])
+            return len(messages)
+    
+    @staticmethod
+    async def _write_behind(db, mode: str = "write_behind", batch_size: int = 5, flush_interval: float = 0.05):
+        """A started ContactWriteBehind over `db`, configured the way the server reads its settings"""
+        from contact_writer import ContactWriteBehind
+        settings = {
+            "CONTACT_WRITE_MODE": mode,
+            "CONTACT_WRITE_BATCH_SIZE": str(batch_size),
+            "CONTACT_WRITE_FLUSH_INTERVAL": str(flush_interval),
+        }
+        previous = {name: os.environ.get(name) for name in settings}
+        os.environ.update(settings)
+        try:
+            writer = ContactWriteBehind(db)
+            await writer.start()
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    del os.environ[name]
+                else:
+                    os.environ[name] = value
+        return writer
+    
+    async def check_write_behind_batching(self):
+        db = self.RecordingDatabase()
+        # A long interval, so only full batches go out until shutdown
+        writer = await self._write_behind(db, batch_size=5, flush_interval=60)
+        messages = StorageConformanceTester._messages(12)
+        for message in messages:
+            await writer.submit(message)
+        await asyncio.sleep(0.1)
+        assert [len(batch) for batch in db.batches] == [5, 5], f"unexpected batches {db.batches}"
+        
+        await writer.stop()
+        assert [len(batch) for batch in db.batches] == [5, 5, 2], "partial batch was not flushed on shutdown"
+        assert sum(db.batches, []) == [message.id for message in messages], "messages written out of order"
+        assert not writer.enabled, "writer still accepts messages after stop"
+    
+    async def check_write_behind_durable(self):
+        db = self.RecordingDatabase()
+        writer = await self._write_behind(db)
+        message, queued = StorageConformanceTester._messages(2)
+        try:
+            db.gate.clear()
+            durable = asyncio.create_task(writer.submit(message, wait=True))
+            await asyncio.sleep(0.2)
+            assert not durable.done(), "durable submit returned before its batch was written"
+            db.gate.set()
+            await asyncio.wait_for(durable, 1)
+            assert db.batches == [[message.id]], "durable message was not written"
+            
+            # Without `wait` the caller returns at once, before the write
+            db.gate.clear()
+            await asyncio.wait_for(writer.submit(queued), 1)
+            assert len(db.batches) == 1, "non-durable submit waited for the write"
+            db.gate.set()
+        finally:
+            await writer.stop()
+        assert db.batches[-1] == [queued.id], "queued message was not written"
+    
+    async def check_write_behind_errors(self):
+        db = self.RecordingDatabase(error=RuntimeError("database unavailable"))
+        messages = StorageConformanceTester._messages(3)
+        writer = await self._write_behind(db)
+        try:
+            await writer.submit(messages[0])
+            try:
+                await asyncio.wait_for(writer.submit(messages[1], wait=True), 1)
+            except RuntimeError as e:
+                assert "database unavailable" in str(e), f"unexpected error {e}"
+            else:
+                raise AssertionError("durable caller was not told its write failed")
+        finally:
+            await writer.stop()
+        
+        # write_behind_sync waits on every submission, so every caller sees the failure
+        writer = await self._write_behind(db, mode="write_behind_sync")
+        try:
+            await asyncio.wait_for(writer.submit(messages[2]), 1)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("write_behind_sync caller was not told its write failed")
+        finally:
+            await writer.stop()
+    
+    async def run_all_tests(self):
+        """Run every component check"""
+        print("🔬 Backend component checks")
+        print("=" * 60)
+        
+        checks = [
+            self.check_rate_limit_burst_and_refill,
+            self.check_rate_limit_buckets,
+            self.check_rate_limit_body_cap,
+            self.check_backend_import_order,
+            self.check_import_line_cap,
+            self.check_spool_during_outage,
+            self.check_warmup_invalid_portfolio_section,
+            self.check_search_caps,
+            self.check_search_index_archive,
+            self.check_portfolio_selection_compression,
+            self.check_duplicate_lookup,
+            self.check_duplicate_non_latin,
+            self.check_duplicate_drop,
+            self.check_write_behind_batching,
+            self.check_write_behind_durable,
+            self.check_write_behind_errors,
+        ]
+        
+        for check in checks:
+            label = f"Component - {check.__name__[len('check_'):]}"
+            try:
+                await check()
+                self.log_test(label, "PASS")
+            except Exception as e:
+                self.log_test(label, "FAIL", f"{type(e).__name__}: {e}")
+        
+        self.print_summary()
+        return self.test_results
+
+class PortfolioBenchmark(PortfolioBackendTester):
+    """Concurrent load generator reporting throughput and latency per route
+
+    Workers pick operations at random according to a weighted mix, so a run
+    with the same seed, mix and request count is repeatable between builds.
+    """
+    
+    # Operation name -> (HTTP method, route template) for the report
+    OPERATIONS = {
+        "portfolio": ("GET", "/api/portfolio"),
+        "portfolio_section": ("GET", "/api/portfolio/{section}"),
+        "contact_post": ("POST", "/api/contact"),
+        "list": ("GET", "/api/contact/messages"),
+        "status_patch": ("PATCH", "/api/contact/messages/{message_id}/status"),
+    }
+    DEFAULT_MIX = "portfolio=50,portfolio_section=15,contact_post=10,list=20,status_patch=5"
+    SECTIONS = ["personal", "experience", "skills", "certifications", "education", "projects"]
+    STATUS_CYCLE = ["read", "replied", "unread"]
+    
+    def __init__(self, base_url: str = None, concurrency: int = 16, requests: int = 2000,
+                 duration: float = None, mix: str = DEFAULT_MIX, seed: int = 1234):
+        super().__init__(base_url)
+        self.concurrency = concurrency
+        self.connection_limit = concurrency
+        self.total_requests = requests
+        self.duration = duration
+        self.mix = self._parse_mix(mix)
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.latencies = {name: [] for name in self.mix}
+        self.errors = {name: {} for name in self.mix}
+        self.message_ids = []
+        self.message_statuses = {}
+    
+    def _parse_mix(self, mix: str) -> Dict[str, float]:
+        weights = {}
+        for part in mix.split(","):
+            name, _, weight = part.partition("=")
+            name = name.strip()
+            if name not in self.OPERATIONS:
+                raise ValueError(f"Unknown operation '{name}'. Must be one of: {list(self.OPERATIONS)}")
+            weights[name] = float(weight or 1)
+        return weights
+    
+    def _contact_payload(self) -> Dict[str, str]:
+        n = self.rng.randrange(1_000_000)
+        return {
+            "name": "Benchmark User",
+            "email": f"bench{n}@example.com",
+            "subject": f"Benchmark message {n}",
+            "message": "Load test message generated by backend_test.py --benchmark."
+        }
+    
+    def _request(self, operation: str):
+        """Build (method, url, kwargs) for one operation"""
+        if operation == "portfolio":
+            return "GET", f"{self.base_url}/api/portfolio", {}
+        if operation == "portfolio_section":
+            return "GET", f"{self.base_url}/api/portfolio/{self.rng.choice(self.SECTIONS)}", {}
+        if operation == "contact_post":
+            return "POST", f"{self.base_url}/api/contact", {"json": self._contact_payload()}
+        if operation == "list":
+            return "GET", f"{self.base_url}/api/contact/messages", {"params": {"limit": 50}}
+        if operation == "status_patch":
+            message_id = self.rng.choice(self.message_ids)
+            # Always move to a different status, a no-op update is answered with 404
+            current = self.message_statuses.get(message_id, "unread")
+            status = self.STATUS_CYCLE[(self.STATUS_CYCLE.index(current) + 1) % len(self.STATUS_CYCLE)]
+            self.message_statuses[message_id] = status
+            return "PATCH", f"{self.base_url}/api/contact/messages/{message_id}/status", {"params": {"status": status}}
+        raise ValueError(operation)
+    
+    async def _seed_messages(self, count: int = 20):
+        """Create messages for status_patch to work on"""
+        for _ in range(count):
+            async with self.session.post(f"{self.base_url}/api/contact", json=self._contact_payload()) as response:
+                if response.status == 200:
+                    self.message_ids.append((await response.json())["contact_id"])
+        if "status_patch" in self.mix and not self.message_ids:
+            raise RuntimeError("Could not create messages for status_patch")
+    
+    async def _worker(self, deadline: float):
+        operations = list(self.mix)
+        weights = [self.mix[name] for name in operations]
+        while time.perf_counter() < deadline:
+            if self.duration is None:
+                if self.remaining <= 0:
+                    return
+                self.remaining -= 1
+            
+            operation = self.rng.choices(operations, weights)[0]
+            method, url, kwargs = self._request(operation)
+            started = time.perf_counter()
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    await response.read()
+                    status = response.status
+            except Exception as e:
+                status = type(e).__name__
+            self.latencies[operation].append(time.perf_counter() - started)
+            if not (isinstance(status, int) and status < 400):
+                self.errors[operation][str(status)] = self.errors[operation].get(str(status), 0) + 1
+    
+    @staticmethod
+    def _summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(latencies)
+        
+        def percentile(p):
+            # Nearest-rank percentile, in milliseconds
+            if not ordered:
+                return None
+            rank = max(int(round(p / 100 * len(ordered) + 0.5)) - 1, 0)
+            return round(ordered[min(rank, len(ordered) - 1)] * 1000, 3)
+        
+        return {
+            "requests": len(ordered),
+            "errors": errors,
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else None,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+        }
+    
+    async def run_all_tests(self):
+        """Run the benchmark and return its results"""
+        await self.setup()
+        try:
+            if "status_patch" in self.mix:
+                await self._seed_messages()
+            
+            self.remaining = self.total_requests
+            started = time.perf_counter()
+            deadline = started + self.duration if self.duration is not None else float("inf")
+            await asyncio.gather(*[self._worker(deadline) for _ in range(self.concurrency)])
+            elapsed = time.perf_counter() - started
+        finally:
+            await self.teardown()
+        
+        routes = {}
+        for operation in self.mix:
+            method, route = self.OPERATIONS[operation]
+            routes[operation] = {
+                "method": method,
+                "route": route,
+                **self._summarize(self.latencies[operation], sum(self.errors[operation].values()), elapsed),
+                "error_statuses": self.errors[operation],
+            }
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        all_errors = sum(route["errors"] for route in routes.values())
+        
+        return {
+            "meta": {
+                "base_url": self.base_url,
+                "timestamp": datetime.now().isoformat(),
+                "concurrency": self.concurrency,
+                "requests": self.total_requests if self.duration is None else None,
+                "duration_s": round(elapsed, 3),
+                "mix": self.mix,
+                "seed": self.seed,
+            },
+            "overall": self._summarize(all_latencies, all_errors, elapsed),
+            "routes": routes,
+        }
+    
+    @staticmethod
+    def print_report(results: Dict[str, Any], baseline: Dict[str, Any] = None):
+        """Print a per-route table, with deltas against a baseline run if given"""
+        print("=" * 60)
+        print("📈 BENCHMARK RESULTS")
+        print("=" * 60)
+        print(f"{'route':<20}{'req':>7}{'err':>6}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+        rows = [("overall", results["overall"])] + list(results["routes"].items())
+        for name, stats in rows:
+            print(f"{name:<20}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput_rps'] or 0:>10.1f}"
+                  f"{stats['p50_ms'] or 0:>9.2f}{stats['p95_ms'] or 0:>9.2f}{stats['p99_ms'] or 0:>9.2f}")
+            if baseline:
+                previous = baseline["overall"] if name == "overall" else baseline["routes"].get(name)
+                if previous:
+                    deltas = []
+                    for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+                        if stats.get(key) and previous.get(key):
+                            deltas.append(f"{key} {(stats[key] - previous[key]) / previous[key] * 100:+.1f}%")
+                    print(f"{'':<20}vs baseline: {', '.join(deltas)}")
+        print()
+        if any("429" in route["error_statuses"] for route in results["routes"].values()):
+            print("⚠️  The server rate-limited the run; use --local, or start it with RATE_LIMIT_ENABLED=false\n")
+
+class SerializationBenchmark:
+    """Micro-benchmark of response encoding, in-process and without a server
+
+    Compares FastAPI's default path (jsonable_encoder, then the stdlib encoder
+    in JSONResponse) with each serializer available to FastJSONResponse, on
+    the portfolio payload and on message listings of increasing size.
+    """
+    
+    def __init__(self, iterations: int = 200):
+        self.iterations = iterations
+    
+    @staticmethod
+    def _payloads() -> Dict[str, Any]:
+        from models import ContactMessage
+        from portfolio_data import PORTFOLIO_DATA
+        
+        def messages(count: int) -> List[Any]:
+            return [
+                ContactMessage(
+                    name=f"Benchmark User {i}",
+                    email=f"user{i}@example.com",
+                    subject=f"Benchmark subject {i}",
+                    message="Benchmark message body " * 20
+                )
+                for i in range(count)
+            ]
+        
+        return {
+            "portfolio": {"success": True, "data": PORTFOLIO_DATA},
+            "messages_50": messages(50),
+            "messages_500": messages(500),
+        }
+    
+    def _time(self, encode, payload) -> float:
+        """Median seconds per call over several rounds"""
+        rounds = []
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(self.iterations):
+                encode(payload)
+            rounds.append((time.perf_counter() - started) / self.iterations)
+        return sorted(rounds)[len(rounds) // 2]
+    
+    def run(self) -> Dict[str, Dict[str, float]]:
+        from fastapi.encoders import jsonable_encoder
+        from starlette.responses import JSONResponse
+        from serialization import SERIALIZERS
+        
+        encoders = {"fastapi_default": lambda payload: JSONResponse(jsonable_encoder(payload)).body}
+        encoders.update(SERIALIZERS)
+        
+        results = {}
+        for name, payload in self._payloads().items():
+            results[name] = {encoder: self._time(encode, payload) * 1000 for encoder, encode in encoders.items()}
+        return results
+    
+    @staticmethod
+    def print_report(results: Dict[str, Dict[str, float]]):
+        print("=" * 60)
+        print("📈 SERIALIZATION RESULTS (ms per response)")
+        print("=" * 60)
+        for payload, timings in results.items():
+            baseline = timings["fastapi_default"]
+            print(f"{payload}")
+            for encoder, ms in timings.items():
+                print(f"  {encoder:<18}{ms:>10.3f}{baseline / ms:>9.1f}x")
+        print()
+
+class ImportTimeReport:
+    """Import cost of the backend app, per module, against a budget
+
+    Runs `python -X importtime -c "import server"` in a fresh interpreter so
+    nothing is already cached in sys.modules, then ranks modules by their
+    cumulative import time.
+    """
+    
+    def __init__(self, budget_ms: float = 1500, top: int = 15):
+        self.budget_ms = budget_ms
+        self.top = top
+    
+    def run(self) -> Dict[str, Any]:
+        import subprocess
+        backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+        env = dict(os.environ, DATABASE_BACKEND=os.environ.get("DATABASE_BACKEND", "memory"))
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import server"],
+            cwd=backend_dir, env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"importing server failed:\n{completed.stderr[-2000:]}")
+        
+        modules = {}
+        for line in completed.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        
+        total_ms = modules["server"][1] / 1000
+        ranked = sorted(
+            ((name, cumulative / 1000) for name, (_, cumulative) in modules.items() if "." not in name),
+            key=lambda item: item[1], reverse=True
+        )
+        return {"total_ms": total_ms, "budget_ms": self.budget_ms, "modules": ranked[:self.top]}
+    
+    @staticmethod
+    def print_report(results: Dict[str, Any]):
+        print("=" * 60)
+        print("📦 IMPORT TIME (cumulative ms, top-level modules)")
+        print("=" * 60)
+        for name, ms in results["modules"]:
+            print(f"  {name:<40}{ms:>10.1f}")
+        status = "within" if results["total_ms"] <= results["budget_ms"] else "OVER"
+        print(f"\nimport server: {results['total_ms']:.1f}ms, {status} the {results['budget_ms']:.0f}ms budget\n")
+
+class LocalServer:
+    """Runs the backend in a subprocess with test settings, for --local runs
+
+    Uses the memory backend unless DATABASE_BACKEND is set, and turns the
+    contact rate limiter off so the API suite and the benchmark exercise the
+    routes rather than the limiter; --components covers the limiter itself.
+    """
+    
+    TEST_ENVIRONMENT = {"RATE_LIMIT_ENABLED": "false"}
+    
+    def __init__(self, env: Dict[str, str] = None, probe: str = "readyz", startup_timeout: float = 30):
+        self.env = env or {}
+        # livez for servers expected to stay unready, e.g. with the database down
+        self.probe = probe
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.log = None
+    
+    def start(self) -> str:
+        """Start the server and wait until it is ready; return its base URL"""
+        import socket
+        import subprocess
+        import urllib.request
+        
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}"
+        backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+        env = dict(os.environ, DATABASE_BACKEND=os.environ.get("DATABASE_BACKEND", "memory"))
+        env.update(self.TEST_ENVIRONMENT)
+        env.update(self.env)
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=backend_dir, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+        
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline and self.process.poll() is None:
+            try:
+                with urllib.request.urlopen(f"{base_url}/api/{self.probe}", timeout=1):
+                    return base_url
+            except Exception:
+                time.sleep(0.2)
+        self.log.seek(0)
+        output = self.log.read().decode("utf-8", "replace")
+        self.stop()
+        raise RuntimeError(f"local server did not become ready:\n{output[-2000:]}")
+    
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+        if self.log:
+            self.log.close()
+            self.log = None
+
 async def main():
     """Main test runner"""
-    print("🧪 Portfolio Backend Test Suite")
-    print("Testing Chindhamani's Portfolio Website Backend")
-    print("=" * 60)
+    parser = argparse.ArgumentParser(description="Portfolio backend test suite")
+    parser.add_argument("--base-url", help="backend URL (defaults to REACT_APP_BACKEND_URL)")
+    parser.add_argument("--conformance", action="store_true",
+                        help="run the storage backend conformance suite instead of the API tests")
+    parser.add_argument("--components", action="store_true",
+                        help="run the in-process component checks instead of the API tests")
+    parser.add_argument("--local", action="store_true",
+                        help="start the backend locally with test settings and run against it")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="run the concurrent load benchmark instead of the API tests")
+    parser.add_argument("--serialization", action="store_true",
+                        help="run the in-process JSON serialization micro-benchmark")
+    parser.add_argument("--import-time", action="store_true",
+                        help="report the backend's import cost against --import-budget")
+    parser.add_argument("--import-budget", type=float, default=1500, help="import-time: budget in ms")
+    parser.add_argument("--concurrency", type=int, default=16, help="benchmark: concurrent workers")
+    parser.add_argument("--requests", type=int, default=2000, help="benchmark: total requests")
+    parser.add_argument("--duration", type=float, help="benchmark: run for this many seconds instead")
+    parser.add_argument("--mix", default=PortfolioBenchmark.DEFAULT_MIX,
+                        help="benchmark: weighted operation mix, e.g. portfolio=80,list=20")
+    parser.add_argument("--seed", type=int, default=1234, help="benchmark: random seed")
+    parser.add_argument("--output", help="benchmark: write JSON results to this file")
+    parser.add_argument("--compare", help="benchmark: JSON results of a previous run to compare against")
+    args = parser.parse_args()
+    
+    if args.import_time:
+        report = ImportTimeReport(budget_ms=args.import_budget)
+        results = report.run()
+        report.print_report(results)
+        return 0 if results["total_ms"] <= results["budget_ms"] else 1
     
-    tester = PortfolioBackendTester()
+    if args.serialization:
+        benchmark = SerializationBenchmark()
+        benchmark.print_report(benchmark.run())
+        return 0
+    
+    server = None
+    if args.local:
+        server = LocalServer()
+        args.base_url = server.start()
+    try:
+        return await run_suite(args)
+    finally:
+        if server:
+            server.stop()
+
+async def run_suite(args) -> int:
+    """Run the suite selected on the command line and return its exit code"""
+    if args.benchmark:
+        benchmark = PortfolioBenchmark(
+            base_url=args.base_url, concurrency=args.concurrency, requests=args.requests,
+            duration=args.duration, mix=args.mix, seed=args.seed
+        )
+        results = await benchmark.run_all_tests()
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        benchmark.print_report(results, baseline)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            print(f"Results written to {args.output}")
+        return 0 if results["overall"]["errors"] == 0 else 1
+    
+    if args.conformance:
+        tester = StorageConformanceTester()
+    elif args.components:
+        tester = ComponentTester()
+    else:
+        print("🧪 Portfolio Backend Test Suite")
+        print("Testing Chindhamani's Portfolio Website Backend")
+        print("=" * 60)
+        tester = PortfolioBackendTester(base_url=args.base_url)
     results = await tester.run_all_tests()
     
     # Return exit code based on test results